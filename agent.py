@@ -2,15 +2,29 @@ import os
 import json
 import logging
 import certifi
-import pytz
 import re
 import asyncio
+import inspect
 import time
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from typing import Annotated
 
+# ── Fast JSON (orjson when installed, stdlib json otherwise) ──────────────────
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 # Fix for macOS SSL certificate verification
 os.environ["SSL_CERT_FILE"] = certifi.where()
 
@@ -45,9 +59,19 @@ from livekit.agents import (
     cli,
     llm,
 )
-from livekit.plugins import openai, sarvam, silero
+from livekit.plugins import openai, sarvam
+
+from config_store import CONFIG_FILE, load_json_file
+
+_STRIP_PLUS  = str.maketrans("", "", "+")
+_PHONE_STRIP = str.maketrans("", "", " \t\n-()")
+_SIP_SCHEME = re.compile(r"^(?:tel:|sip:)")
+
+def _normalize_phone(phone: str) -> str:
+    """'+91 98765-43210' / '919876543210' → '+919876543210'; non-numbers pass through."""
+    p = phone.translate(_PHONE_STRIP)
+    return f"+{p}" if p.isdigit() else p
 
-CONFIG_FILE = "config.json"
 
 # ── Rate limiting (#37) ───────────────────────────────────────────────────────
 _call_timestamps: dict = defaultdict(list)
@@ -66,43 +90,301 @@ def is_rate_limited(phone: str) -> bool:
 
 
 # ── Config loader (#17 partial — per-client path awareness) ───────────────────
+LIVE_CONFIG_DEFAULTS = MappingProxyType({
+    "agent_instructions":        "",
+    "stt_min_endpointing_delay": 0.05,
+    "llm_model":                 "gpt-4o-mini",
+    "llm_provider":              "openai",
+    "tts_voice":                 "kavya",
+    "tts_language":              "hi-IN",
+    "tts_provider":              "sarvam",
+    "stt_provider":              "sarvam",
+    "stt_language":              "unknown",
+    "lang_preset":               "multilingual",
+    "max_turns":                 25,
+})
+
+# Resolved config per caller number → (resolved_at, path, st_mtime_ns, resolved).
+# Remembers which candidate file won (including "no per-client file") so repeat
+# callers skip the probe; a hit still stats the winning file, so dashboard edits
+# apply immediately. A newly created per-client file is picked up after the TTL.
+# Failed loads (no file, or a candidate that couldn't be parsed) are never
+# cached — a fixed config.json applies on the very next call.
+LIVE_CONFIG_TTL     = 60    # seconds
+LIVE_CONFIG_MAXSIZE = 1024
+_live_cfg_cache: "OrderedDict[str, tuple[float, str, int, dict]]" = OrderedDict()
+_live_cfg_lock = threading.Lock()
+
+def _config_key(phone_number: str | None) -> str:
+    if not phone_number or phone_number == "unknown":
+        return ""
+    return _normalize_phone(phone_number).translate(_STRIP_PLUS)
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
 def get_live_config(phone_number: str | None = None):
     """Load config — tries per-client file first, then default config.json."""
+    key = _config_key(phone_number)
+    with _live_cfg_lock:
+        cached = _live_cfg_cache.get(key)
+    if cached and time.monotonic() - cached[0] < LIVE_CONFIG_TTL \
+            and _mtime_ns(cached[1]) == cached[2]:
+        return dict(cached[3])  # callers append caller history to agent_instructions
+
+    path, resolved, clean = _resolve_live_config(key)
+    if clean:
+        with _live_cfg_lock:
+            _live_cfg_cache[key] = (time.monotonic(), path, _mtime_ns(path), resolved)
+            _live_cfg_cache.move_to_end(key)
+            while len(_live_cfg_cache) > LIVE_CONFIG_MAXSIZE:
+                _live_cfg_cache.popitem(last=False)
+    return dict(resolved)
+
+
+def _resolve_live_config(key: str) -> tuple[str | None, dict, bool]:
+    """(loaded path, resolved config, clean) — clean is False if nothing loaded or any read failed."""
     config = {}
-    paths = []
-    if phone_number and phone_number != "unknown":
-        clean = phone_number.replace("+", "").replace(" ", "")
-        paths.append(f"configs/{clean}.json")
+    loaded = None
+    clean  = True
+    paths = [f"configs/{key}.json"] if key else []
     paths += ["configs/default.json", CONFIG_FILE]
 
     for path in paths:
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    config = json.load(f)
-                    logger.info(f"[CONFIG] Loaded: {path}")
+        try:
+            config = load_json_file(path)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.error(f"[CONFIG] Failed to read {path}: {e}")
+            clean = False
+            continue
+        logger.info("[CONFIG] Loaded: %s", path)
+        loaded = path
+        break
+
+    # Defaults first, config.json (including extra keys) on top
+    return loaded, {**LIVE_CONFIG_DEFAULTS, **config}, clean and loaded is not None
+
+
+# ── Env overrides + recording credentials snapshot ────────────────────────────
+CONFIG_ENV_KEYS = (
+    "LIVEKIT_URL", "LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "OPENAI_API_KEY",
+    "SARVAM_API_KEY", "CAL_API_KEY", "TELEGRAM_BOT_TOKEN", "SUPABASE_URL", "SUPABASE_KEY",
+)
+
+# Credentials required to record a call, keyed by their short name in _LK
+_LK_REQUIRED_ENV = {
+    "url":    "LIVEKIT_URL",
+    "key":    "LIVEKIT_API_KEY",
+    "secret": "LIVEKIT_API_SECRET",
+    "s3_ak":  "SUPABASE_S3_ACCESS_KEY",
+    "s3_sk":  "SUPABASE_S3_SECRET_KEY",
+    "s3_ep":  "SUPABASE_S3_ENDPOINT",
+}
+
+def _snapshot_lk_env() -> dict:
+    snap = {k: os.environ.get(env, "") for k, env in _LK_REQUIRED_ENV.items()}
+    snap["s3_region"]    = os.environ.get("SUPABASE_S3_REGION", "ap-south-1")
+    snap["supabase_url"] = os.environ.get("SUPABASE_URL", "")
+    return snap
+
+_LK = _snapshot_lk_env()
+
+def apply_config_env_overrides(live_config: dict) -> None:
+    """Override OS env vars from UI config, then refresh the recording credentials snapshot."""
+    global _LK
+    for key in CONFIG_ENV_KEYS:
+        val = live_config.get(key.lower(), "")
+        if val:
+            os.environ[key] = val
+    _LK = _snapshot_lk_env()
+    reload_cal_config()
+
+
+# ── Recording → Supabase Storage ──────────────────────────────────────────────
+async def start_recording(room_name: str) -> str | None:
+    """Start an audio-only room egress to Supabase S3. Returns the egress ID, or None."""
+    missing = [env for k, env in _LK_REQUIRED_ENV.items() if not _LK[k]]
+    if missing:
+        logger.warning(f"[RECORDING] Not configured (missing {', '.join(missing)}) — skipping recording")
+        return None
+    rec_api = api.LiveKitAPI(url=_LK["url"], api_key=_LK["key"], api_secret=_LK["secret"])
+    try:
+        egress_resp = await asyncio.wait_for(
+            rec_api.egress.start_room_composite_egress(
+                api.RoomCompositeEgressRequest(
+                    room_name=room_name,
+                    audio_only=True,
+                    file_outputs=[api.EncodedFileOutput(
+                        file_type=api.EncodedFileType.OGG,
+                        filepath=f"recordings/{room_name}.ogg",
+                        s3=api.S3Upload(
+                            access_key=_LK["s3_ak"],
+                            secret=_LK["s3_sk"],
+                            bucket="call-recordings",
+                            region=_LK["s3_region"],
+                            endpoint=_LK["s3_ep"],
+                            force_path_style=True,
+                        )
+                    )]
+                )
+            ),
+            timeout=10.0,
+        )
+        logger.info(f"[RECORDING] Started egress: {egress_resp.egress_id}")
+        return egress_resp.egress_id
+    except asyncio.TimeoutError:
+        logger.warning("[RECORDING] Egress start timed out after 10s — skipping recording")
+    except Exception as e:
+        logger.warning(f"[RECORDING] Failed to start recording: {e}")
+    finally:
+        await rec_api.aclose()
+    return None
+
+
+async def stop_recording(egress_id: str | None, room_name: str) -> str:
+    """Stop the egress started by start_recording. Returns the public recording URL, or ""."""
+    if not egress_id:
+        return ""
+    stop_api = api.LiveKitAPI(url=_LK["url"], api_key=_LK["key"], api_secret=_LK["secret"])
+    try:
+        await stop_api.egress.stop_egress(api.StopEgressRequest(egress_id=egress_id))
+        url = (
+            f"{_LK['supabase_url']}/storage/v1/object/public/"
+            f"call-recordings/recordings/{room_name}.ogg"
+        )
+        logger.info(f"[RECORDING] Stopped. URL: {url}")
+        return url
+    except Exception as e:
+        logger.warning(f"[RECORDING] Stop failed: {e}")
+        return ""
+    finally:
+        await stop_api.aclose()
+
+
+# ── Caller memory (#15) ───────────────────────────────────────────────────────
+# Repeat callers (IVR redials especially) hit the same call_logs row; keep the
+# formatted history per phone for a short TTL and drop it once a new log is saved.
+CALLER_HISTORY_TTL     = 180   # seconds
+CALLER_HISTORY_MAXSIZE = 512
+_caller_history_cache: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+
+def invalidate_caller_history(phone: str) -> None:
+    _caller_history_cache.pop(phone, None)
+
+def _fetch_last_call(phone: str):
+    from db import get_supabase
+    sb = get_supabase()
+    if sb is None:
+        raise RuntimeError("Supabase not configured")
+    return (sb.table("call_logs")
+              .select("summary, created_at")
+              .eq("phone", phone)
+              .order("created_at", desc=True)
+              .limit(1)
+              .execute())
+
+async def get_caller_history(phone: str) -> str:
+    if phone == "unknown":
+        return ""
+    cached = _caller_history_cache.get(phone)
+    if cached and time.monotonic() - cached[1] < CALLER_HISTORY_TTL:
+        _caller_history_cache.move_to_end(phone)
+        logger.info("[MEMORY] Cache hit for %s", phone)
+        return cached[0]
+    try:
+        result = await asyncio.to_thread(_fetch_last_call, phone)
+    except Exception as e:
+        logger.warning(f"[MEMORY] Could not load history: {e}")
+        return ""
+    history = ""
+    if result.data:
+        last = result.data[0]
+        history = f"\n\n[CALLER HISTORY: Last call {last['created_at'][:10]}. Summary: {last['summary']}]"
+    _caller_history_cache[phone] = (history, time.monotonic())
+    _caller_history_cache.move_to_end(phone)
+    while len(_caller_history_cache) > CALLER_HISTORY_MAXSIZE:
+        _caller_history_cache.popitem(last=False)
+    return history
+
+
+# ── Real-time transcript streaming (#33) ─────────────────────────────────────
+class TranscriptBatcher:
+    """Buffers call_transcripts rows and writes them in batches from one task."""
+
+    def __init__(self, room_id: str, phone: str, max_batch: int = 16,
+                 flush_interval: float = 0.25, maxsize: int = 256):
+        self.room_id        = room_id
+        self.phone          = phone
+        self.max_batch      = max_batch
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def enqueue(self, role: str, content: str) -> None:
+        try:
+            self._queue.put_nowait({
+                "call_room_id": self.room_id,
+                "phone":        self.phone,
+                "role":         role,
+                "content":      content,
+            })
+        except asyncio.QueueFull:
+            logger.debug("[TRANSCRIPT-STREAM] Queue full — dropped %s entry", role)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is None:
+                return
+            batch    = [row]
+            stop     = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
                     break
-            except Exception as e:
-                logger.error(f"[CONFIG] Failed to read {path}: {e}")
-
-    resolved = {
-        "agent_instructions":       config.get("agent_instructions", ""),
-        "stt_min_endpointing_delay":config.get("stt_min_endpointing_delay", 0.05),
-        "llm_model":                config.get("llm_model", "gpt-4o-mini"),
-        "llm_provider":             config.get("llm_provider", "openai"),
-        "tts_voice":                config.get("tts_voice", "kavya"),
-        "tts_language":             config.get("tts_language", "hi-IN"),
-        "tts_provider":             config.get("tts_provider", "sarvam"),
-        "stt_provider":             config.get("stt_provider", "sarvam"),
-        "stt_language":             config.get("stt_language", "unknown"),
-        "lang_preset":              config.get("lang_preset", "multilingual"),
-        "max_turns":                config.get("max_turns", 25),
-    }
-    # Merge extra config keys without overwriting resolved values
-    for k, v in config.items():
-        if k not in resolved:
-            resolved[k] = v
-    return resolved
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: list) -> None:
+        try:
+            from db import save_transcript_entries_async
+            result = await save_transcript_entries_async(batch)
+            if not result.get("success"):
+                logger.debug("[TRANSCRIPT-STREAM] %s", result.get("message"))
+        except Exception as e:
+            logger.debug("[TRANSCRIPT-STREAM] %s", e)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flushes whatever is queued and stops the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        try:
+            await asyncio.wait_for(self._task, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"[TRANSCRIPT-STREAM] Flush on close failed: {e}")
+        self._task = None
 
 
 # ── Token counter (#11) ───────────────────────────────────────────────────────
@@ -110,11 +392,76 @@ def count_tokens(text: str) -> int:
     """Approximate token count using word-based heuristic (avoids tiktoken download hang)."""
     return int(len(text.split()) / 0.75)  # rough estimate: ~0.75 words per token
 
+LOG_PROMPT_TOKENS = os.environ.get("LOG_PROMPT_TOKENS", "0") == "1"
+
+@lru_cache(maxsize=256)
+def _prompt_tokens(text: str) -> int:
+    # Prompts change per config, not per call — memoize by text
+    return count_tokens(text)
+
+
+# ── Transcript builder ────────────────────────────────────────────────────────
+_TRANSCRIPT_PREFIX = {"user": "[USER] ", "assistant": "[ASSISTANT] "}
+
+def build_transcript(messages) -> str:
+    """Render user/assistant chat messages as '[ROLE] text' lines."""
+    # Locals for the per-message lookups — long calls have hundreds of messages
+    prefixes, _getattr, _isinstance = _TRANSCRIPT_PREFIX, getattr, isinstance
+    lines = []
+    append = lines.append
+    for msg in messages:
+        prefix = prefixes.get(_getattr(msg, "role", None))
+        if prefix is None:
+            continue
+        content = _getattr(msg, "content", "")
+        if _isinstance(content, list):
+            content = " ".join([c for c in content if _isinstance(c, str)])
+        append(f"{prefix}{content}")
+    return "\n".join(lines)
+
+
+# ── Sentiment (#14) ───────────────────────────────────────────────────────────
+SENTIMENT_MIN_CHARS = 80  # shorter transcripts are classified "neutral" without an LLM call
+
+_oai_client     = None
+_oai_client_key = ""
+
+def get_openai_client():
+    """Shared AsyncOpenAI client — rebuilt only when OPENAI_API_KEY changes (UI config override)."""
+    global _oai_client, _oai_client_key
+    key = os.environ.get("OPENAI_API_KEY", "")
+    if _oai_client is None or key != _oai_client_key:
+        import httpx
+        import openai as _oai
+        _oai_client = _oai.AsyncOpenAI(
+            api_key=key,
+            http_client=httpx.AsyncClient(http2=True, timeout=10.0),
+        )
+        _oai_client_key = key
+    return _oai_client
+
+
+# ── Business hours (#31) — indexed by weekday, minutes since midnight IST ────
+_IST = ZoneInfo("Asia/Kolkata")
+_HOURS = (
+    ("Monday",    600, 1140, "10:00–19:00"),
+    ("Tuesday",   600, 1140, "10:00–19:00"),
+    ("Wednesday", 600, 1140, "10:00–19:00"),
+    ("Thursday",  600, 1140, "10:00–19:00"),
+    ("Friday",    600, 1140, "10:00–19:00"),
+    ("Saturday",  600, 1020, "10:00–17:00"),
+    ("Sunday",    None, None, None),
+)
+
 
 # ── IST time context ──────────────────────────────────────────────────────────
 def get_ist_time_context() -> str:
-    ist = pytz.timezone("Asia/Kolkata")
-    now = datetime.now(ist)
+    # The block only changes once a minute — reuse it across calls within that minute
+    return _ist_time_context(int(time.time()) // 60)
+
+@lru_cache(maxsize=2)
+def _ist_time_context(minute: int) -> str:
+    now = datetime.fromtimestamp(minute * 60, _IST)
     today_str = now.strftime("%A, %B %d, %Y")
     time_str  = now.strftime("%I:%M %p")
     days_lines = []
@@ -131,6 +478,22 @@ def get_ist_time_context() -> str:
     )
 
 
+# ── Turn limit (#29) ──────────────────────────────────────────────────────────
+WRAP_UP_INSTRUCTION = (
+    "\n\n[WRAP UP]\nThe call has reached its turn limit. In this reply, politely wrap up: "
+    "thank the caller, say they can call back anytime, and say a warm goodbye."
+)
+
+
+# ── Filler filter ─────────────────────────────────────────────────────────────
+FILLER_WORDS = frozenset({
+    "okay", "ok", "uh", "hmm", "hm", "yeah", "yes",
+    "no", "um", "ah", "oh", "right", "sure", "fine", "good",
+    "haan", "han", "theek", "theek hai", "accha", "ji", "ha",
+})
+MAX_FILLER_LEN = max(map(len, FILLER_WORDS))
+
+
 # ── Language presets ──────────────────────────────────────────────────────────
 LANGUAGE_PRESETS = {
     "hinglish":    {"label": "Hinglish (Hindi+English)", "tts_language": "hi-IN", "tts_voice": "kavya",  "instruction": "Speak in natural Hinglish — mix Hindi and English like educated Indians do. Default to Hindi but use English words when more natural."},
@@ -146,36 +509,342 @@ LANGUAGE_PRESETS = {
     "multilingual":{"label": "Multilingual (Auto)",     "tts_language": "hi-IN", "tts_voice": "kavya",  "instruction": "Detect the caller's language from their first message and reply in that SAME language for the entire call. Supported: Hindi, Hinglish, English, Tamil, Telugu, Gujarati, Bengali, Marathi, Kannada, Malayalam. Switch if caller switches."},
 }
 
+_LANG_DIRECTIVES = {k: f"\n\n[LANGUAGE DIRECTIVE]\n{v['instruction']}" for k, v in LANGUAGE_PRESETS.items()}
+_LANG_FALLBACK   = _LANG_DIRECTIVES["multilingual"]
+
 def get_language_instruction(lang_preset: str) -> str:
-    preset = LANGUAGE_PRESETS.get(lang_preset, LANGUAGE_PRESETS["multilingual"])
-    return f"\n\n[LANGUAGE DIRECTIVE]\n{preset['instruction']}"
+    return _LANG_DIRECTIVES.get(lang_preset, _LANG_FALLBACK)
+
+
+# ── Provider factories (#8 Groq, #9 Deepgram, #10 ElevenLabs, #27 Claude) ───
+def _sarvam_stt(language: str):
+    return sarvam.STT(
+        language=language,          # "unknown" = auto-detect (#20)
+        model="saaras:v3",
+        mode="translate",
+        flush_signal=True,
+        sample_rate=16000,          # force 16kHz (#1)
+    )
+
+def _sarvam_tts(language: str, voice: str):
+    return sarvam.TTS(
+        target_language_code=language,
+        model="bulbul:v3",
+        speaker=voice,
+        speech_sample_rate=24000,   # force 24kHz (#2)
+    )
+
+def build_llm(live_config: dict):
+    llm_provider = live_config.get("llm_provider", "openai")
+    llm_model    = live_config.get("llm_model", "gpt-4o-mini")
+    if llm_provider == "groq":
+        logger.info(f"[LLM] Using Groq: {llm_model}")
+        return openai.LLM.with_groq(
+            model=llm_model or "llama-3.3-70b-versatile",
+            max_completion_tokens=120,
+        )
+    if llm_provider == "claude":
+        _anthropic_key = os.environ.get("ANTHROPIC_API_KEY", "")
+        try:
+            from livekit.plugins import anthropic as lk_anthropic
+            logger.info(f"[LLM] Using Claude via Anthropic plugin: {llm_model}")
+            return lk_anthropic.LLM(
+                model=llm_model or "claude-3-5-haiku-latest",
+                api_key=_anthropic_key,
+                max_tokens=120,
+            )
+        except ImportError:
+            logger.warning("[LLM] anthropic plugin not installed — falling back to OpenAI-compatible endpoint")
+            return openai.LLM(
+                model=llm_model or "claude-3-5-haiku-latest",
+                base_url="https://api.anthropic.com/v1/",
+                api_key=_anthropic_key,
+                max_completion_tokens=120,
+            )
+    logger.info(f"[LLM] Using OpenAI: {llm_model}")
+    return openai.LLM(model=llm_model, max_completion_tokens=120)  # cap tokens (#7)
+
+def build_stt(live_config: dict):
+    stt_language = live_config.get("stt_language", "unknown")
+    if live_config.get("stt_provider", "sarvam") == "deepgram":
+        try:
+            from livekit.plugins import deepgram
+            logger.info("[STT] Using Deepgram Nova-2")
+            return deepgram.STT(
+                model="nova-2-general",
+                language="multi",        # multilingual mode
+                interim_results=False,
+            )
+        except ImportError:
+            logger.warning("[STT] deepgram plugin not installed — falling back to Sarvam")
+            return _sarvam_stt(stt_language)
+    logger.info("[STT] Using Sarvam Saaras v3")
+    return _sarvam_stt(stt_language)
+
+def build_tts(live_config: dict):
+    tts_voice    = live_config.get("tts_voice", "kavya")
+    tts_language = live_config.get("tts_language", "hi-IN")
+    if live_config.get("tts_provider", "sarvam") == "elevenlabs":
+        try:
+            from livekit.plugins import elevenlabs
+            _el_voice_id = live_config.get("elevenlabs_voice_id", "21m00Tcm4TlvDq8ikWAM")
+            logger.info(f"[TTS] Using ElevenLabs Turbo v2.5 — voice: {_el_voice_id}")
+            return elevenlabs.TTS(
+                model="eleven_turbo_v2_5",
+                voice_id=_el_voice_id,
+            )
+        except ImportError:
+            logger.warning("[TTS] elevenlabs plugin not installed — falling back to Sarvam")
+            return _sarvam_tts(tts_language, tts_voice)
+    logger.info(f"[TTS] Using Sarvam Bulbul v3 — voice: {tts_voice} lang: {tts_language}")
+    return _sarvam_tts(tts_language, tts_voice)
+
+
+async def _safe_prewarm(agent_tts) -> None:
+    """TTS pre-warm (#12) — never raises; prewarm() is sync on some plugins."""
+    try:
+        res = agent_tts.prewarm()
+        if inspect.isawaitable(res):
+            await asyncio.wait_for(res, timeout=5.0)
+        logger.info("[TTS] Pre-warmed successfully")
+    except asyncio.TimeoutError:
+        logger.warning("[TTS] Pre-warm timed out after 5s — continuing without it")
+    except Exception as e:
+        logger.debug(f"[TTS] Pre-warm skipped: {e}")
 
 
 # ── External imports ──────────────────────────────────────────────────────────
-from calendar_tools import get_available_slots, create_booking, cancel_booking
-from notify import (
-    notify_booking_confirmed,
-    notify_booking_cancelled,
-    notify_call_no_booking,
-    notify_agent_error,
+from calendar_tools import (
+    get_available_slots_batch,
+    async_create_booking,
+    calendar_configured,
+    cancel_booking,
+    close_http_client,
+    reload_cal_config,
 )
+from notify import notify_booking_confirmed, notify_call_no_booking
+
+
+# ── Email validation ──────────────────────────────────────────────────────────
+# Whole-token fixes only — a plain replace("gmai", "gmail") also turned every
+# correct "gmail" into "gmaill"
+_EMAIL_DOMAIN_FIXES = (
+    (re.compile(r"\b(?:gmial|gmal|gmai)\b"), "gmail"),
+    (re.compile(r"\byaho\b"),                "yahoo"),
+    (re.compile(r"\bhotmal\b"),              "hotmail"),
+    (re.compile(r"\.co(?:n|om)$"),            ".com"),
+)
+
+try:
+    from emval import EmailValidator
+    # No DNS deliverability lookup — it would block the event loop mid-call
+    _EMAIL_VALIDATOR = EmailValidator(
+        allow_smtputf8=True,
+        allow_empty_local=False,
+        allow_quoted_local=False,
+        allow_domain_literal=False,
+        deliverable_address=False,
+    )
+except ImportError:
+    _EMAIL_VALIDATOR = None
+    logger.info("[EMAIL] emval not installed — using basic email check")
+
+
+def validate_email_address(email: str) -> str | None:
+    """Normalized address, or None if it isn't a valid email."""
+    if _EMAIL_VALIDATOR is not None:
+        try:
+            return _EMAIL_VALIDATOR.validate_email(email).normalized
+        except Exception:
+            return None
+    local, _, domain = email.partition("@")
+    if not local or "." not in domain or domain.startswith(".") or domain.endswith("."):
+        return None
+    return email
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # TOOL CONTEXT — All AI-callable functions
 # ══════════════════════════════════════════════════════════════════════════════
 
+SLOT_BATCH_WINDOW = 0.05  # seconds — coalesces parallel check_availability calls
+SLOT_PREFETCH_DAYS = 7    # warm the slot cache for the coming week at call start
+BOOKING_FIELDS     = ("start_time", "caller_name", "caller_phone", "caller_email", "notes")
+
 class AgentTools(llm.ToolContext):
+    __slots__ = ("caller_phone", "caller_name", "booking_intent", "sip_domain",
+                 "ctx_api", "room_name", "_sip_identity", "_slot_dates", "_slot_batch", "_slot_tasks",
+                 "_pending_booking", "_booked_intent", "_superseded", "_slot_prefetch")
 
-    def __init__(self, caller_phone: str, caller_name: str = ""):
+    def __init__(self, caller_phone: str, caller_name: str = "", ctx_api=None, room_name: str | None = None):
         super().__init__(tools=[])
         self.caller_phone        = caller_phone
         self.caller_name         = caller_name
         self.booking_intent: dict | None = None
         self.sip_domain          = os.getenv("VOBIZ_SIP_DOMAIN")
-        self.ctx_api             = None
-        self.room_name           = None
-        self._sip_identity       = None
+        self.ctx_api             = ctx_api
+        self.room_name           = room_name
+        self._sip_identity       = (
+            f"sip_{caller_phone.translate(_STRIP_PLUS)}" if caller_phone != "unknown" else "inbound_caller"
+        )
+        # check_availability calls landing within SLOT_BATCH_WINDOW share one lookup
+        self._slot_dates: list[str] = []
+        self._slot_batch: asyncio.Task | None = None
+        self._slot_tasks: set[asyncio.Task] = set()  # every batch still in flight
+        self._pending_booking: asyncio.Task | None = None
+        self._booked_intent: dict | None = None  # the details _pending_booking was made with
+        self._superseded: set[asyncio.Task] = set()  # cancelling bookings the caller changed
+        self._slot_prefetch: asyncio.Task | None = None
+
+    def prefetch_slots(self) -> None:
+        """
+        Fill the slot cache for the coming week while the greeting plays. Both
+        backends take a date range, so seven days cost the same single request
+        as one — the LLM's first check_availability is then a cache hit.
+        """
+        if not calendar_configured():
+            return
+        today = datetime.now(_IST).date()
+        dates = [(today + timedelta(days=i)).isoformat() for i in range(SLOT_PREFETCH_DAYS)]
+        self._slot_prefetch = asyncio.create_task(get_available_slots_batch(dates))
+        self._slot_prefetch.add_done_callback(self._on_prefetch_done)
+
+    async def cancel_slot_tasks(self) -> None:
+        """Stop the prefetch and any slot batch still running — call before closing the HTTP client."""
+        tasks = [t for t in (self._slot_prefetch, *self._slot_tasks) if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _on_prefetch_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[TOOL] Slot prefetch failed: {task.exception()!r}")
+
+    async def _get_slots(self, date: str) -> list:
+        self._slot_dates.append(date)
+        if self._slot_batch is None:
+            self._slot_batch = asyncio.create_task(self._run_slot_batch())
+            self._slot_tasks.add(self._slot_batch)
+            self._slot_batch.add_done_callback(self._slot_tasks.discard)
+        result = await asyncio.shield(self._slot_batch)
+        return result.get(date, [])
+
+    # ── Speculative booking ───────────────────────────────────────────────
+    # The booking is made as soon as the intent is saved, so the Cal.com/GCal
+    # round-trip overlaps the goodbye instead of running after hangup.
+    def _start_booking(self) -> None:
+        intent = {k: self.booking_intent[k] for k in BOOKING_FIELDS}
+        self._booked_intent   = intent
+        self._pending_booking = asyncio.create_task(async_create_booking(
+            start_time=intent["start_time"],
+            caller_name=intent["caller_name"] or "Unknown Caller",
+            caller_phone=intent["caller_phone"],
+            notes=intent["notes"],
+            caller_email=intent["caller_email"],
+        ))
+        self._pending_booking.add_done_callback(self._on_booking_done)
+
+    def _on_booking_done(self, task: asyncio.Task) -> None:
+        # A booking superseded by a later save_booking_intent is _cancel_superseded's job
+        if task.cancelled() or task is not self._pending_booking:
+            return
+        exc = task.exception()
+        result = {"success": False, "message": str(exc)} if exc else task.result()
+        if result.get("success"):
+            logger.info(f"[BOOKING] Confirmed in background: {result.get('booking_id')}")
+            return
+        # Let the next turn tell the caller; shutdown will retry from the intent
+        logger.warning(f"[BOOKING] Background booking failed: {result.get('message')}")
+        if self.booking_intent is not None:
+            self.booking_intent["error"] = result.get("message") or "unknown error"
+        self._pending_booking = None
+        self._booked_intent   = None
+
+    def _rebook(self) -> None:
+        """The caller changed the details — drop the old booking and book the new ones."""
+        old, old_intent = self._pending_booking, self._booked_intent
+        logger.info(f"[BOOKING] Details changed ({old_intent['start_time']} → "
+                    f"{self.booking_intent['start_time']}) — rebooking")
+        self._reconcile(old, old_intent, reason="Rescheduled by caller during the call")
+        self._start_booking()
+
+    def _reconcile(self, task: asyncio.Task, intent: dict, reason: str) -> None:
+        """Cancel whatever `task` books once it lands; settle_booking waits these out."""
+        cleanup = asyncio.create_task(self._cancel_superseded(task, intent, reason))
+        self._superseded.add(cleanup)
+        cleanup.add_done_callback(self._superseded.discard)
+
+    @staticmethod
+    async def _cancel_superseded(task: asyncio.Task, intent: dict, reason: str) -> None:
+        # Let the request finish rather than cancel it — an aborted POST may
+        # still have booked on the server, and then there'd be nothing to undo
+        try:
+            result = await task
+        except Exception as e:
+            logger.debug(f"[BOOKING] Superseded booking never completed: {e!r}")
+            return
+        if result.get("success") and result.get("booking_id"):
+            logger.info(f"[BOOKING] Cancelling superseded booking for {intent['start_time']}")
+            cancelled = await cancel_booking(result["booking_id"], reason=reason)
+            if not cancelled.get("success"):
+                logger.error(
+                    f"[BOOKING] Could not cancel superseded booking {result['booking_id']} "
+                    f"for {intent['start_time']} — manual cleanup needed: {cancelled.get('message')}"
+                )
+
+    async def settle_booking(self, timeout: float = 10.0) -> tuple[dict, dict]:
+        """
+        (result, intent) for the call's booking: the speculative one if it is
+        still current, else a fresh attempt. `intent` is exactly what was sent
+        to the calendar, so notifications can't drift from the real booking.
+        A booking that fails is retried once; one still in flight at the timeout
+        is left to finish and cancelled if it lands. Also waits out those
+        cancellations — nothing may still be using the calendar client when
+        shutdown closes it.
+        """
+        try:
+            pending, intent = self._pending_booking, self._booked_intent
+            if pending is not None:
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(pending), timeout=timeout)
+                except asyncio.TimeoutError:
+                    # Leave the POST running — it may still book, and then it must be undone
+                    logger.error(f"[BOOKING] Pending booking did not settle in {timeout}s — cancelling it if it lands")
+                    self._reconcile(pending, intent, reason="Booking did not confirm before the call ended")
+                    return {"success": False, "booking_id": None, "message": "Booking timed out."}, intent
+                except Exception as e:
+                    result = {"success": False, "message": str(e)}
+                if result.get("success"):
+                    return result, intent
+                # Failed before _on_booking_done could drop it — one fresh attempt
+                logger.warning(f"[BOOKING] Pending booking failed ({result.get('message')}) — retrying once")
+            else:
+                intent = {k: self.booking_intent[k] for k in BOOKING_FIELDS}
+            return await async_create_booking(
+                start_time=intent["start_time"],
+                caller_name=intent["caller_name"] or "Unknown Caller",
+                caller_phone=intent["caller_phone"],
+                notes=intent["notes"],
+                caller_email=intent["caller_email"],
+            ), intent
+        finally:
+            if self._superseded:
+                _, still_running = await asyncio.wait(self._superseded, timeout=timeout)
+                for task in still_running:
+                    task.cancel()
+
+    async def _run_slot_batch(self) -> dict:
+        await asyncio.sleep(SLOT_BATCH_WINDOW)
+        dates, self._slot_dates, self._slot_batch = self._slot_dates, [], None
+        # Still warming up — wait for it rather than duplicating the request
+        prefetch = self._slot_prefetch
+        if prefetch is not None and not prefetch.done():
+            await asyncio.wait({prefetch})
+        if len(dates) > 1:
+            logger.info(f"[TOOL] check_availability batched: {dates}")
+        return await get_available_slots_batch(dates)
 
     # ── Tool: Transfer to Human ───────────────────────────────────────────
     @llm.function_tool(description="Transfer this call to a human agent. Use if: caller asks for human, is angry, or query is outside scope.")
@@ -183,9 +852,8 @@ class AgentTools(llm.ToolContext):
         logger.info("[TOOL] transfer_call triggered")
         destination = os.getenv("DEFAULT_TRANSFER_NUMBER")
         if destination and self.sip_domain and "@" not in destination:
-            clean_dest  = destination.replace("tel:", "").replace("sip:", "")
-            destination = f"sip:{clean_dest}@{self.sip_domain}"
-        if destination and not destination.startswith("sip:"):
+            destination = f"sip:{_SIP_SCHEME.sub('', destination)}@{self.sip_domain}"
+        elif destination and not destination.startswith("sip:"):
             destination = f"sip:{destination}"
         try:
             if self.ctx_api and self.room_name and destination and self._sip_identity:
@@ -203,9 +871,20 @@ class AgentTools(llm.ToolContext):
             logger.error(f"Transfer failed: {e}")
             return "Unable to transfer right now."
 
+    def take_booking_error(self) -> str | None:
+        """A background booking failure the caller hasn't heard about yet — reported once."""
+        if self.booking_intent and self.booking_intent.get("error"):
+            return self.booking_intent.pop("error")
+        return None
+
     # ── Tool: End Call ────────────────────────────────────────────────────
     @llm.function_tool(description="End the call. Use ONLY when caller says bye/goodbye or after booking is fully confirmed.")
     async def end_call(self) -> str:
+        error = self.take_booking_error()
+        if error:
+            logger.info("[TOOL] end_call deferred — reporting booking failure first")
+            return (f"Before ending: the booking could not be completed ({error}). "
+                    "Apologise, tell the caller the team will call back to confirm, then end the call.")
         logger.info("[TOOL] end_call triggered — hanging up.")
         try:
             if self.ctx_api and self.room_name and self._sip_identity:
@@ -240,16 +919,16 @@ class AgentTools(llm.ToolContext):
             email = email.replace(phrase, ".")
         email = email.replace(" ", "")  # remove any remaining spaces
         # Fix common domain misspellings
-        email = email.replace("gmial", "gmail").replace("gmal", "gmail").replace("gmai", "gmail")
-        email = email.replace("yaho", "yahoo").replace("hotmal", "hotmail")
-        email = email.replace(".con", ".com").replace(".coom", ".com")
+        for pattern, fixed in _EMAIL_DOMAIN_FIXES:
+            email = pattern.sub(fixed, email)
 
         logger.info(f"[TOOL] save_booking_intent: {caller_name} <{email}> at {start_time}")
 
-        # Basic validation
-        if "@" not in email or "." not in email.split("@")[-1]:
+        valid_email = validate_email_address(email)
+        if valid_email is None:
             logger.warning(f"[TOOL] Email looks invalid: {email}")
             return f"The email '{email}' doesn't look right. Please ask the caller to spell their email again, letter by letter."
+        email = valid_email
 
         try:
             self.booking_intent = {
@@ -260,6 +939,12 @@ class AgentTools(llm.ToolContext):
                 "notes":        notes,
             }
             self.caller_name = caller_name
+            if self._pending_booking is None:
+                self._start_booking()
+            elif any(self.booking_intent[k] != self._booked_intent[k] for k in BOOKING_FIELDS):
+                self._rebook()
+            else:
+                logger.info("[TOOL] save_booking_intent repeated with the same details — keeping the booking in flight")
             return f"Booking intent saved for {caller_name} ({email}) at {start_time}. I'll confirm after the call."
         except Exception as e:
             logger.error(f"[TOOL] save_booking_intent failed: {e}")
@@ -273,10 +958,10 @@ class AgentTools(llm.ToolContext):
     ) -> str:
         logger.info(f"[TOOL] check_availability: date={date}")
         try:
-            slots = await get_available_slots(date)
+            slots = await self._get_slots(date)
             if not slots:
                 return f"No available slots on {date}. Would you like to check another date?"
-            slot_strings = [s.get("start_time", str(s))[-8:][:5] for s in slots[:6]]
+            slot_strings = [s["label"] for s in slots[:6]]
             return f"Available slots on {date}: {', '.join(slot_strings)} IST."
         except Exception as e:
             logger.error(f"[TOOL] check_availability failed: {e}")
@@ -285,24 +970,13 @@ class AgentTools(llm.ToolContext):
     # ── Tool: Business Hours (#31) ────────────────────────────────────────
     @llm.function_tool(description="Check if the business is currently open and what the operating hours are.")
     async def get_business_hours(self) -> str:
-        ist  = pytz.timezone("Asia/Kolkata")
-        now  = datetime.now(ist)
-        hours = {
-            0: ("Monday",    "10:00", "19:00"),
-            1: ("Tuesday",   "10:00", "19:00"),
-            2: ("Wednesday", "10:00", "19:00"),
-            3: ("Thursday",  "10:00", "19:00"),
-            4: ("Friday",    "10:00", "19:00"),
-            5: ("Saturday",  "10:00", "17:00"),
-            6: ("Sunday",    None,    None),
-        }
-        day_name, open_t, close_t = hours[now.weekday()]
-        current_time = now.strftime("%H:%M")
-        if open_t is None:
+        now  = datetime.now(_IST)
+        day_name, open_m, close_m, hours_str = _HOURS[now.weekday()]
+        if open_m is None:
             return "We are closed on Sundays. Next opening: Monday 10:00 AM IST."
-        if open_t <= current_time <= close_t:
-            return f"We are OPEN. Today ({day_name}): {open_t}–{close_t} IST."
-        return f"We are CLOSED. Today ({day_name}): {open_t}–{close_t} IST."
+        if open_m <= now.hour * 60 + now.minute <= close_m:
+            return f"We are OPEN. Today ({day_name}): {hours_str} IST."
+        return f"We are CLOSED. Today ({day_name}): {hours_str} IST."
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -310,51 +984,142 @@ class AgentTools(llm.ToolContext):
 # ══════════════════════════════════════════════════════════════════════════════
 
 class OutboundAssistant(Agent):
+    __slots__ = ("_agent_tools", "_live_config", "_prewarm_task", "_greet_handle", "_greet_prompt")
 
-    def __init__(self, agent_tools: AgentTools, first_line: str = "", live_config: dict | None = None):
+    def __init__(self, agent_tools: AgentTools, first_line: str = "", live_config: dict | None = None,
+                 prewarm_task: asyncio.Task | None = None):
         tools = llm.find_function_tools(agent_tools)
-        self._first_line  = first_line
-        self._live_config = live_config or {}
+        self._agent_tools  = agent_tools
+        self._live_config  = live_config or {}
+        self._prewarm_task = prewarm_task
+        self._greet_handle = None
+
+        # Greeting instruction is a fixed function of config — build it once.
+        # json.dumps quotes/escapes it so an apostrophe can't break "exactly".
+        greeting = self._live_config.get(
+            "first_line",
+            first_line or (
+                "Namaste! This is Aryan from RapidX AI — we help businesses automate with AI. "
+                "Hmm, may I ask what kind of business you run?"
+            )
+        )
+        self._greet_prompt = "Say exactly this phrase: " + json.dumps(greeting, ensure_ascii=False)
         live_config_loaded = self._live_config
 
         base_instructions = live_config_loaded.get("agent_instructions", "")
         ist_context       = get_ist_time_context()
         lang_preset       = live_config_loaded.get("lang_preset", "multilingual")
         lang_instruction  = get_language_instruction(lang_preset)
-        final_instructions = base_instructions + ist_context + lang_instruction
+        final_instructions = "".join((base_instructions, ist_context, lang_instruction))
 
-        # Token counter (#11)
-        token_count = count_tokens(final_instructions)
-        logger.info(f"[PROMPT] System prompt: {token_count} tokens")
-        if token_count > 600:
-            logger.warning(f"[PROMPT] Prompt exceeds 600 tokens — consider trimming for latency")
+        # Token counter (#11) — opt-in via LOG_PROMPT_TOKENS=1
+        if LOG_PROMPT_TOKENS:
+            token_count = _prompt_tokens(final_instructions)
+            logger.info(f"[PROMPT] System prompt: {token_count} tokens")
+            if token_count > 600:
+                logger.warning(f"[PROMPT] Prompt exceeds 600 tokens — consider trimming for latency")
 
         super().__init__(instructions=final_instructions, tools=tools)
 
     async def on_enter(self):
-        greeting = self._live_config.get(
-            "first_line",
-            self._first_line or (
-                "Namaste! This is Aryan from RapidX AI — we help businesses automate with AI. "
-                "Hmm, may I ask what kind of business you run?"
-            )
-        )
         logger.info(f"[AGENT] on_enter() called, generating greeting...")
-        await self.session.generate_reply(
-            instructions=f"Say exactly this phrase: '{greeting}'"
-        )
-        logger.info(f"[AGENT] on_enter() greeting generation complete")
+        if self._prewarm_task and not self._prewarm_task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._prewarm_task), timeout=0.5)
+            except asyncio.TimeoutError:
+                logger.info("[TTS] Pre-warm still running — greeting without waiting")
+        # generate_reply schedules the speech and returns a handle — don't block
+        # on_enter behind LLM first-token + TTS; shutdown settles the handle
+        self._greet_handle = self.session.generate_reply(instructions=self._greet_prompt)
+        logger.info("[AGENT] on_enter() greeting scheduled")
+
+    async def on_user_turn_completed(self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage) -> None:
+        # The speculative booking runs in the background — put a failure in front
+        # of the LLM on the very next turn instead of waiting for end_call
+        error = self._agent_tools.take_booking_error()
+        if error:
+            logger.info("[BOOKING] Reporting background booking failure this turn")
+            turn_ctx.add_message(
+                role="system",
+                content=(f"The booking could not be completed ({error}). Tell the caller now, "
+                         "apologise, and offer to try another slot or have the team call back."),
+            )
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# MAIN ENTRYPOINT
+# PER-CALL STATE + EVENT HANDLERS
 # ══════════════════════════════════════════════════════════════════════════════
 
-agent_is_speaking = False
+class _CallState:
+    """Per-call counters and flags; its bound methods are the session/room handlers."""
+    __slots__ = ("agent", "batcher", "max_turns", "on_hangup", "turn_count",
+                 "interrupt_count", "agent_is_speaking", "shutdown_started", "shutdown_lock")
 
-async def entrypoint(ctx: JobContext):
-    global agent_is_speaking
+    def __init__(self, agent: "OutboundAssistant", batcher: TranscriptBatcher, max_turns: int, on_hangup):
+        self.agent             = agent
+        self.batcher           = batcher
+        self.max_turns         = max_turns
+        self.on_hangup         = on_hangup
+        self.turn_count        = 0      # (#29)
+        self.interrupt_count   = 0      # (#30)
+        self.agent_is_speaking = False  # echo filter — per call, never shared across sessions
+        self.shutdown_started  = asyncio.Event()
+        self.shutdown_lock     = asyncio.Lock()
+
+    def on_speech_started(self, ev):
+        self.agent_is_speaking = True
 
+    def on_speech_finished(self, ev):
+        self.agent_is_speaking = False
+
+    # Interrupt logging (#30)
+    def on_interrupted(self, ev):
+        self.interrupt_count += 1
+        logger.info("[INTERRUPT] Agent interrupted. Total: %d", self.interrupt_count)
+
+    def on_user_speech(self, ev):
+        # Cheapest rejections first — a raw length under 3 can't strip to 3+
+        transcript = ev.user_transcript
+        if len(transcript) < 3:
+            return
+        transcript = transcript.strip()
+        if len(transcript) < 3:
+            return
+        if self.agent_is_speaking:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[FILTER-ECHO] Dropped: %r", transcript)
+            return
+        # Length prefilter first — real sentences never pay for .lower()
+        core = transcript.rstrip(".")
+        if len(core) <= MAX_FILLER_LEN and core.lower() in FILLER_WORDS:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[FILTER-FILLER] Dropped: %r", transcript)
+            return
+
+        # Real-time transcript stream
+        self.batcher.enqueue("user", transcript)
+
+        # Turn counter + auto-close (#29)
+        self.turn_count += 1
+        logger.info("[TRANSCRIPT] Turn %d/%d: %r", self.turn_count, self.max_turns, transcript)
+        if self.turn_count == self.max_turns:
+            # Fold the wrap-up into the reply this turn already produces — a separate
+            # generate_reply cost an extra LLM+TTS cycle and could talk over it
+            logger.info("[LIMIT] Reached %d turns — wrapping up", self.max_turns)
+            agent = self.agent
+            asyncio.create_task(agent.update_instructions(agent.instructions + WRAP_UP_INSTRUCTION))
+
+    def on_participant_disconnected(self, participant):
+        logger.info(f"[HANGUP] Participant disconnected: {participant.identity}")
+        self.agent_is_speaking = False
+        asyncio.create_task(self.on_hangup())
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MAIN ENTRYPOINT
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def entrypoint(ctx: JobContext):
     # ── Connect ───────────────────────────────────────────────────────────
     await ctx.connect()
     logger.info(f"[ROOM] Connected: {ctx.room.name}")
@@ -368,7 +1133,7 @@ async def entrypoint(ctx: JobContext):
     metadata = ctx.job.metadata or ""
     if metadata:
         try:
-            meta = json.loads(metadata)
+            meta = _json_loads(metadata)
             phone_number = meta.get("phone_number")
         except Exception:
             pass
@@ -388,7 +1153,8 @@ async def entrypoint(ctx: JobContext):
             if m:
                 phone_number = m.group()
 
-    caller_phone = phone_number or "unknown"
+    # One canonical form keys rate limits, caller history, config and call logs
+    caller_phone = _normalize_phone(phone_number) if phone_number else "unknown"
 
     # ── Rate limiting (#37) ───────────────────────────────────────────────
     if is_rate_limited(caller_phone):
@@ -396,149 +1162,49 @@ async def entrypoint(ctx: JobContext):
         return
 
     # ── Load config ───────────────────────────────────────────────────────
-    live_config   = get_live_config(caller_phone)
+    live_config   = await asyncio.to_thread(get_live_config, caller_phone)
     delay_setting = live_config.get("stt_min_endpointing_delay", 0.05)
-    llm_model     = live_config.get("llm_model", "gpt-4o-mini")
-    llm_provider  = live_config.get("llm_provider", "openai")
     tts_voice     = live_config.get("tts_voice", "kavya")
-    tts_language  = live_config.get("tts_language", "hi-IN")
-    tts_provider  = live_config.get("tts_provider", "sarvam")
-    stt_provider  = live_config.get("stt_provider", "sarvam")
-    stt_language  = live_config.get("stt_language", "unknown")  # auto-detect (#20)
     max_turns     = live_config.get("max_turns", 25)
 
     # Override OS env vars from UI config
-    for key in ["LIVEKIT_URL","LIVEKIT_API_KEY","LIVEKIT_API_SECRET","OPENAI_API_KEY",
-                "SARVAM_API_KEY","CAL_API_KEY","TELEGRAM_BOT_TOKEN","SUPABASE_URL","SUPABASE_KEY"]:
-        val = live_config.get(key.lower(), "")
-        if val:
-            os.environ[key] = val
-
-    # ── Caller memory (#15) ───────────────────────────────────────────────
-    async def get_caller_history(phone: str) -> str:
-        if phone == "unknown":
-            return ""
-        try:
-            from supabase import create_client
-            sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
-            result = (sb.table("call_logs")
-                        .select("summary, created_at")
-                        .eq("phone", phone)
-                        .order("created_at", desc=True)
-                        .limit(1)
-                        .execute())
-            if result.data:
-                last = result.data[0]
-                return f"\n\n[CALLER HISTORY: Last call {last['created_at'][:10]}. Summary: {last['summary']}]"
-        except Exception as e:
-            logger.warning(f"[MEMORY] Could not load history: {e}")
-        return ""
-
-    caller_history = await get_caller_history(caller_phone)
-    if caller_history:
+    apply_config_env_overrides(live_config)
+
+    # Caller history and provider construction are independent — run them together
+    caller_history, agent_llm, agent_stt, agent_tts = await asyncio.gather(
+        get_caller_history(caller_phone),
+        asyncio.to_thread(build_llm, live_config),
+        asyncio.to_thread(build_stt, live_config),
+        asyncio.to_thread(build_tts, live_config),
+    )
+    if caller_history and caller_history.strip():
         logger.info(f"[MEMORY] Loaded caller history for {caller_phone}")
-        # Append to live_config instructions
-        live_config["agent_instructions"] = (live_config.get("agent_instructions","") + caller_history)
+        # Append to live_config instructions (history carries its own leading separator)
+        live_config["agent_instructions"] = f"{live_config.get('agent_instructions', '')}{caller_history}"
 
     # ── Instantiate tools ─────────────────────────────────────────────────
-    agent_tools = AgentTools(caller_phone=caller_phone, caller_name=caller_name)
-    agent_tools._sip_identity = (
-        f"sip_{caller_phone.replace('+','')}" if phone_number else "inbound_caller"
+    agent_tools = AgentTools(
+        caller_phone=caller_phone,
+        caller_name=caller_name,
+        ctx_api=ctx.api,
+        room_name=ctx.room.name,
     )
-    agent_tools.ctx_api   = ctx.api
-    agent_tools.room_name = ctx.room.name
-
-    # ── Build LLM (#8 Groq support) ───────────────────────────────────────
-    if llm_provider == "groq":
-        agent_llm = openai.LLM.with_groq(
-            model=llm_model or "llama-3.3-70b-versatile",
-            max_completion_tokens=120,
-        )
-        logger.info(f"[LLM] Using Groq: {llm_model}")
-    elif llm_provider == "claude":
-        # Claude Haiku 3.5 via Anthropic API (#27)
-        _anthropic_key = os.environ.get("ANTHROPIC_API_KEY", "")
-        agent_llm = openai.LLM(
-            model=llm_model or "claude-haiku-3-5-latest",
-            base_url="https://api.anthropic.com/v1/",
-            api_key=_anthropic_key,
-            max_completion_tokens=120,
-        )
-        logger.info(f"[LLM] Using Claude via Anthropic: {llm_model}")
-    else:
-        agent_llm = openai.LLM(model=llm_model, max_completion_tokens=120)  # cap tokens (#7)
-        logger.info(f"[LLM] Using OpenAI: {llm_model}")
-
-    # ── Build STT (#1 16kHz, #20 auto-detect, #9 Deepgram) ──────────────
-    if stt_provider == "deepgram":
-        try:
-            from livekit.plugins import deepgram
-            agent_stt = deepgram.STT(
-                model="nova-2-general",
-                language="multi",        # multilingual mode
-                interim_results=False,
-            )
-            logger.info("[STT] Using Deepgram Nova-2")
-        except ImportError:
-            logger.warning("[STT] deepgram plugin not installed — falling back to Sarvam")
-            agent_stt = sarvam.STT(
-                language=stt_language,
-                model="saaras:v3",
-                mode="translate",
-                flush_signal=True,
-                sample_rate=16000,
-            )
-    else:
-        agent_stt = sarvam.STT(
-            language=stt_language,      # "unknown" = auto-detect (#20)
-            model="saaras:v3",
-            mode="translate",
-            flush_signal=True,
-            sample_rate=16000,          # force 16kHz (#1)
-        )
-        logger.info("[STT] Using Sarvam Saaras v3")
-
-    # ── Build TTS (#2 24kHz, #10 ElevenLabs) ────────────────────────────
-    if tts_provider == "elevenlabs":
-        try:
-            from livekit.plugins import elevenlabs
-            _el_voice_id = live_config.get("elevenlabs_voice_id", "21m00Tcm4TlvDq8ikWAM")
-            agent_tts = elevenlabs.TTS(
-                model="eleven_turbo_v2_5",
-                voice_id=_el_voice_id,
-            )
-            logger.info(f"[TTS] Using ElevenLabs Turbo v2.5 — voice: {_el_voice_id}")
-        except ImportError:
-            logger.warning("[TTS] elevenlabs plugin not installed — falling back to Sarvam")
-            agent_tts = sarvam.TTS(
-                target_language_code=tts_language,
-                model="bulbul:v3",
-                speaker=tts_voice,
-                speech_sample_rate=24000,
-            )
-    else:
-        agent_tts = sarvam.TTS(
-            target_language_code=tts_language,
-            model="bulbul:v3",
-            speaker=tts_voice,
-            speech_sample_rate=24000,   # force 24kHz (#2)
-        )
-        logger.info(f"[TTS] Using Sarvam Bulbul v3 — voice: {tts_voice} lang: {tts_language}")
 
     # ── Sentence chunker (keep responses short for voice) ─────────────────
     def before_tts_cb(agent_response: str) -> str:
         sentences = re.split(r'(?<=[।.!?])\s+', agent_response.strip())
         return sentences[0] if sentences else agent_response
 
-    # ── Turn counter + auto-close (#29) ──────────────────────────────────
-    turn_count    = 0
-    interrupt_count = 0  # (#30)
+    # ── TTS pre-warm (#12) + slot prefetch — overlap with session.start ──
+    prewarm_task = asyncio.create_task(_safe_prewarm(agent_tts))
+    agent_tools.prefetch_slots()
 
     # ── Build agent ───────────────────────────────────────────────────────
     agent = OutboundAssistant(
         agent_tools=agent_tools,
         first_line=live_config.get("first_line", ""),
         live_config=live_config,
+        prewarm_task=prewarm_task,
     )
 
     # ── Build session (#3 noise cancellation attempted) ───────────────────
@@ -566,189 +1232,108 @@ async def entrypoint(ctx: JobContext):
         allow_interruptions=True,
     )
 
-    logger.info("[SESSION] Starting session.start()...")
-    try:
-        await asyncio.wait_for(
-            session.start(room=ctx.room, agent=agent, room_input_options=room_input),
-            timeout=30.0,
-        )
-        logger.info("[SESSION] session.start() completed successfully")
-    except asyncio.TimeoutError:
-        logger.error("[SESSION] session.start() timed out after 30s!")
-        return
-
-    # ── TTS pre-warm (#12) ────────────────────────────────────────────────
-    try:
-        await asyncio.wait_for(session.tts.prewarm(), timeout=5.0)
-        logger.info("[TTS] Pre-warmed successfully")
-    except asyncio.TimeoutError:
-        logger.warning("[TTS] Pre-warm timed out after 5s — continuing without it")
-    except Exception as e:
-        logger.debug(f"[TTS] Pre-warm skipped: {e}")
-
-    logger.info("[AGENT] Session live — waiting for caller audio.")
-    call_start_time = datetime.now()
-
-    # ── Recording → Supabase Storage ─────────────────────────────────────
-    egress_id = None
-    try:
-        rec_api = api.LiveKitAPI(
-            url=os.environ["LIVEKIT_URL"],
-            api_key=os.environ["LIVEKIT_API_KEY"],
-            api_secret=os.environ["LIVEKIT_API_SECRET"],
-        )
-        egress_resp = await asyncio.wait_for(
-            rec_api.egress.start_room_composite_egress(
-                api.RoomCompositeEgressRequest(
-                    room_name=ctx.room.name,
-                    audio_only=True,
-                    file_outputs=[api.EncodedFileOutput(
-                        file_type=api.EncodedFileType.OGG,
-                        filepath=f"recordings/{ctx.room.name}.ogg",
-                        s3=api.S3Upload(
-                            access_key=os.environ["SUPABASE_S3_ACCESS_KEY"],
-                            secret=os.environ["SUPABASE_S3_SECRET_KEY"],
-                            bucket="call-recordings",
-                            region=os.environ.get("SUPABASE_S3_REGION", "ap-south-1"),
-                            endpoint=os.environ["SUPABASE_S3_ENDPOINT"],
-                            force_path_style=True,
-                        )
-                    )]
-                )
-            ),
-            timeout=10.0,
-        )
-        egress_id = egress_resp.egress_id
-        await rec_api.aclose()
-        logger.info(f"[RECORDING] Started egress: {egress_id}")
-    except asyncio.TimeoutError:
-        logger.warning("[RECORDING] Egress start timed out after 10s — skipping recording")
-    except Exception as e:
-        logger.warning(f"[RECORDING] Failed to start recording: {e}")
-
     # ── Upsert active_calls (#38) ─────────────────────────────────────────
+    def _upsert_active_call_sync(status: str):
+        from db import get_supabase
+        sb = get_supabase()
+        if sb is None:
+            return
+        sb.table("active_calls").upsert({
+            "room_id":     ctx.room.name,
+            "phone":       caller_phone,
+            "caller_name": caller_name,
+            "status":      status,
+            "last_updated": datetime.utcnow().isoformat(),
+        }).execute()
+
     async def upsert_active_call(status: str):
         try:
-            from supabase import create_client
-            sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
-            sb.table("active_calls").upsert({
-                "room_id":     ctx.room.name,
-                "phone":       caller_phone,
-                "caller_name": caller_name,
-                "status":      status,
-                "last_updated": datetime.utcnow().isoformat(),
-            }).execute()
+            await asyncio.to_thread(_upsert_active_call_sync, status)
         except Exception as e:
             logger.debug(f"[ACTIVE-CALL] {e}")
 
-    await upsert_active_call("active")
+    # ── Session start + recording → Supabase Storage ─────────────────────
+    # One task group: if session.start fails or times out, the sibling setup is
+    # cancelled and any egress that did start is stopped instead of leaking.
+    # Recording and the active_calls upsert are independent round-trips (both
+    # swallow their own errors) so they run alongside session.start.
+    logger.info("[SESSION] Starting session.start()...")
+    recording_task = None
+    try:
+        async with asyncio.timeout(30.0):
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(session.start(room=ctx.room, agent=agent, room_input_options=room_input))
+                recording_task = tg.create_task(start_recording(ctx.room.name))
+                tg.create_task(upsert_active_call("active"))
+        logger.info("[SESSION] session.start() completed successfully")
+    except Exception as e:
+        if isinstance(e, TimeoutError):
+            logger.error("[SESSION] session.start() timed out after 30s!")
+        else:
+            logger.error(f"[SESSION] session.start() failed: {e!r}")
+        if recording_task and recording_task.done() and not recording_task.cancelled() \
+                and recording_task.exception() is None and recording_task.result():
+            await stop_recording(recording_task.result(), ctx.room.name)
+        prewarm_task.cancel()
+        await agent_tools.cancel_slot_tasks()
+        await close_http_client()
+        await upsert_active_call("failed")
+        return
+
+    egress_id = recording_task.result()
+    logger.info("[AGENT] Session live — waiting for caller audio.")
+    call_start_time = datetime.now()     # wall clock — call_date/hour analytics
+    call_start_mono = time.monotonic()   # duration — immune to clock adjustments
 
     # ── Real-time transcript streaming (#33) ─────────────────────────────
-    async def _log_transcript(role: str, content: str):
-        try:
-            from supabase import create_client
-            sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
-            sb.table("call_transcripts").insert({
-                "call_room_id": ctx.room.name,
-                "phone":        caller_phone,
-                "role":         role,
-                "content":      content,
-            }).execute()
-        except Exception as e:
-            logger.debug(f"[TRANSCRIPT-STREAM] {e}")
+    transcript_batcher = TranscriptBatcher(ctx.room.name, caller_phone)
+    transcript_batcher.start()
 
     # ── Session event handlers ────────────────────────────────────────────
-    @session.on("agent_speech_started")
-    def _agent_speech_started(ev):
-        global agent_is_speaking
-        agent_is_speaking = True
-
-    @session.on("agent_speech_finished")
-    def _agent_speech_finished(ev):
-        global agent_is_speaking
-        agent_is_speaking = False
-
-    # Interrupt logging (#30)
-    @session.on("agent_speech_interrupted")
-    def _on_interrupted(ev):
-        nonlocal interrupt_count
-        interrupt_count += 1
-        logger.info(f"[INTERRUPT] Agent interrupted. Total: {interrupt_count}")
-
-    FILLER_WORDS = {
-        "okay.", "okay", "ok", "uh", "hmm", "hm", "yeah", "yes",
-        "no", "um", "ah", "oh", "right", "sure", "fine", "good",
-        "haan", "han", "theek", "theek hai", "accha", "ji", "ha",
-    }
-
-    @session.on("user_speech_committed")
-    def on_user_speech_committed(ev):
-        nonlocal turn_count
-        global agent_is_speaking
-
-        transcript = ev.user_transcript.strip()
-        transcript_lower = transcript.lower().rstrip(".")
-
-        if agent_is_speaking:
-            logger.debug(f"[FILTER-ECHO] Dropped: '{transcript}'")
-            return
-        if not transcript or len(transcript) < 3:
-            return
-        if transcript_lower in FILLER_WORDS:
-            logger.debug(f"[FILTER-FILLER] Dropped: '{transcript}'")
-            return
-
-        # Real-time transcript stream
-        asyncio.create_task(_log_transcript("user", transcript))
-
-        # Turn counter + auto-close (#29)
-        turn_count += 1
-        logger.info(f"[TRANSCRIPT] Turn {turn_count}/{max_turns}: '{transcript}'")
-        if turn_count >= max_turns:
-            logger.info(f"[LIMIT] Reached {max_turns} turns — wrapping up")
-            asyncio.create_task(
-                session.generate_reply(
-                    instructions="Politely wrap up: thank the caller, say they can call back anytime, and say a warm goodbye."
-                )
-            )
-
-    _shutdown_done = False
-
-    @ctx.room.on("participant_disconnected")
-    def on_participant_disconnected(participant):
-        global agent_is_speaking
-        logger.info(f"[HANGUP] Participant disconnected: {participant.identity}")
-        agent_is_speaking = False
-        asyncio.create_task(unified_shutdown_hook(ctx))
+    state = _CallState(
+        agent=agent,
+        batcher=transcript_batcher,
+        max_turns=max_turns,
+        on_hangup=lambda: unified_shutdown_hook(ctx),
+    )
+    session.on("agent_speech_started",     state.on_speech_started)
+    session.on("agent_speech_finished",    state.on_speech_finished)
+    session.on("agent_speech_interrupted", state.on_interrupted)
+    session.on("user_speech_committed",    state.on_user_speech)
+    ctx.room.on("participant_disconnected", state.on_participant_disconnected)
 
     # ══════════════════════════════════════════════════════════════════════
     # POST-CALL SHUTDOWN HOOK
     # ══════════════════════════════════════════════════════════════════════
 
     async def unified_shutdown_hook(shutdown_ctx: JobContext):
-        nonlocal _shutdown_done
-        if _shutdown_done:
-            logger.info("[SHUTDOWN] Already ran — skipping duplicate.")
-            return
-        _shutdown_done = True
-        logger.info("[SHUTDOWN] Sequence started.")
-
-        duration = int((datetime.now() - call_start_time).total_seconds())
+        # Called from both participant_disconnected and the job shutdown callback
+        async with state.shutdown_lock:
+            if state.shutdown_started.is_set():
+                logger.info("[SHUTDOWN] Already ran — skipping duplicate.")
+                return
+            state.shutdown_started.set()
+        duration = int(time.monotonic() - call_start_mono)
+
+        # Caller hung up mid-greeting — stop it rather than leave the speech pending
+        greet = agent._greet_handle
+        if greet is not None and not greet.done():
+            try:
+                greet.interrupt()
+            except Exception as e:
+                logger.debug(f"[SHUTDOWN] Greeting interrupt skipped: {e}")
 
-        # Booking
+        # Booking — notifications (Telegram/WhatsApp) are blocking HTTP calls with no
+        # dependency on transcript/sentiment, so they run in a thread alongside the rest
         booking_status_msg = "No booking"
+        notify_task = None
         if agent_tools.booking_intent:
-            from calendar_tools import async_create_booking
-            intent = agent_tools.booking_intent
-            result = await async_create_booking(
-                start_time=intent["start_time"],
-                caller_name=intent["caller_name"] or "Unknown Caller",
-                caller_phone=intent["caller_phone"],
-                notes=intent.get("notes", ""),
-                caller_email=intent.get("caller_email", ""),
-            )
+            # Normally already booked in the background while the call wound down;
+            # notify from the details that were actually booked
+            result, intent = await agent_tools.settle_booking()
             if result.get("success"):
-                notify_booking_confirmed(
+                notify_task = asyncio.create_task(asyncio.to_thread(
+                    notify_booking_confirmed,
                     caller_name=intent["caller_name"],
                     caller_phone=intent["caller_phone"],
                     booking_time_iso=intent["start_time"],
@@ -756,18 +1341,19 @@ async def entrypoint(ctx: JobContext):
                     notes=intent["notes"],
                     tts_voice=tts_voice,
                     ai_summary="",
-                )
+                ))
                 booking_status_msg = f"Booking Confirmed: {result.get('booking_id')}"
             else:
                 booking_status_msg = f"Booking Failed: {result.get('message')}"
         else:
-            notify_call_no_booking(
+            notify_task = asyncio.create_task(asyncio.to_thread(
+                notify_call_no_booking,
                 caller_name=agent_tools.caller_name,
                 caller_phone=agent_tools.caller_phone,
                 call_summary="Caller did not schedule during this call.",
                 tts_voice=tts_voice,
                 duration_seconds=duration,
-            )
+            ))
 
         # Build transcript
         transcript_text = ""
@@ -775,33 +1361,32 @@ async def entrypoint(ctx: JobContext):
             messages = agent.chat_ctx.messages
             if callable(messages):
                 messages = messages()
-            lines = []
-            for msg in messages:
-                if getattr(msg, "role", None) in ("user", "assistant"):
-                    content = getattr(msg, "content", "")
-                    if isinstance(content, list):
-                        content = " ".join(str(c) for c in content if isinstance(c, str))
-                    lines.append(f"[{msg.role.upper()}] {content}")
-            transcript_text = "\n".join(lines)
+            transcript_text = build_transcript(messages)
         except Exception as e:
             logger.error(f"[SHUTDOWN] Transcript read failed: {e}")
             transcript_text = "unavailable"
 
-        # Sentiment analysis (#14)
-        sentiment = "unknown"
-        if transcript_text and transcript_text != "unavailable":
+        # Sentiment analysis (#14) — runs concurrently with stopping the recording
+        async def classify_sentiment() -> str:
+            if not transcript_text or transcript_text == "unavailable":
+                return "unknown"
+            # Too little said to classify — skip the LLM round-trip
+            if len(transcript_text) < SENTIMENT_MIN_CHARS:
+                return "neutral"
             try:
-                import openai as _oai
-                _client = _oai.AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-                resp = await _client.chat.completions.create(
+                resp = await get_openai_client().chat.completions.create(
                     model="gpt-4o-mini", max_tokens=5,
                     messages=[{"role":"user","content":
                         f"Classify this call as one word: positive, neutral, negative, or frustrated.\n\n{transcript_text[:800]}"}]
                 )
-                sentiment = resp.choices[0].message.content.strip().lower()
-                logger.info(f"[SENTIMENT] {sentiment}")
+                return resp.choices[0].message.content.strip().lower()
             except Exception as e:
                 logger.warning(f"[SENTIMENT] Failed: {e}")
+                return "unknown"
+
+        sentiment, recording_url = await asyncio.gather(
+            classify_sentiment(), stop_recording(egress_id, ctx.room.name)
+        )
 
         # Cost estimation (#34)
         def estimate_cost(dur: int, chars: int) -> float:
@@ -813,42 +1398,20 @@ async def entrypoint(ctx: JobContext):
                 5
             )
         estimated_cost = estimate_cost(duration, len(transcript_text))
-        logger.info(f"[COST] Estimated: ${estimated_cost}")
 
         # Analytics timestamps (#19)
-        ist = pytz.timezone("Asia/Kolkata")
-        call_dt = call_start_time.astimezone(ist)
-
-        # Stop recording
-        recording_url = ""
-        if egress_id:
-            try:
-                stop_api = api.LiveKitAPI(
-                    url=os.environ["LIVEKIT_URL"],
-                    api_key=os.environ["LIVEKIT_API_KEY"],
-                    api_secret=os.environ["LIVEKIT_API_SECRET"],
-                )
-                await stop_api.egress.stop_egress(api.StopEgressRequest(egress_id=egress_id))
-                await stop_api.aclose()
-                recording_url = (
-                    f"{os.environ.get('SUPABASE_URL','')}/storage/v1/object/public/"
-                    f"call-recordings/recordings/{ctx.room.name}.ogg"
-                )
-                logger.info(f"[RECORDING] Stopped. URL: {recording_url}")
-            except Exception as e:
-                logger.warning(f"[RECORDING] Stop failed: {e}")
-
-        # Update active_calls to completed (#38)
-        await upsert_active_call("completed")
+        call_dt = call_start_time.astimezone(_IST)
 
         # n8n webhook (#39)
-        _n8n_url = os.getenv("N8N_WEBHOOK_URL")
-        if _n8n_url:
+        async def trigger_n8n():
+            _n8n_url = os.getenv("N8N_WEBHOOK_URL")
+            if not _n8n_url:
+                return
             try:
                 import httpx
                 await asyncio.get_event_loop().run_in_executor(
                     None,
-                    lambda: httpx.post(_n8n_url, json={
+                    lambda: httpx.post(_n8n_url, content=_json_dumps({
                         "event":        "call_completed",
                         "phone":        caller_phone,
                         "caller_name":  agent_tools.caller_name,
@@ -857,18 +1420,17 @@ async def entrypoint(ctx: JobContext):
                         "sentiment":    sentiment,
                         "summary":      booking_status_msg,
                         "recording_url":recording_url,
-                        "interrupt_count": interrupt_count,
-                    }, timeout=5.0)
+                        "interrupt_count": state.interrupt_count,
+                    }), headers={"Content-Type": "application/json"}, timeout=5.0)
                 )
                 logger.info("[N8N] Webhook triggered")
             except Exception as e:
                 logger.warning(f"[N8N] Webhook failed: {e}")
 
-        # Save to Supabase
-        logger.info(f"[SHUTDOWN] Saving call log to Supabase for {caller_phone} (duration={duration}s)")
-        try:
-            from db import save_call_log
-            result = save_call_log(
+        # Save to Supabase — one finalize_call RPC marks active_calls completed (#38)
+        # and inserts the call log; falls back to separate writes if the RPC is missing
+        async def save_log() -> bool:
+            log_fields = dict(
                 phone=caller_phone,
                 duration=duration,
                 transcript=transcript_text,
@@ -881,11 +1443,53 @@ async def entrypoint(ctx: JobContext):
                 call_hour=call_dt.hour,
                 call_day_of_week=call_dt.strftime("%A"),
                 was_booked=bool(agent_tools.booking_intent),
-                interrupt_count=interrupt_count,
+                interrupt_count=state.interrupt_count,
             )
-            logger.info(f"[SHUTDOWN] save_call_log result: {result}")
-        except Exception as e:
-            logger.error(f"[SHUTDOWN] save_call_log EXCEPTION: {e}")
+            try:
+                from db import finalize_call_async, save_call_log_async
+                result = await finalize_call_async(room_id=ctx.room.name, **log_fields)
+                if not result.get("success"):
+                    logger.warning(f"[SHUTDOWN] finalize_call failed ({result.get('message')}) — using separate writes")
+                    _, result = await asyncio.gather(
+                        upsert_active_call("completed"),
+                        save_call_log_async(**log_fields),
+                    )
+                if result.get("success"):
+                    invalidate_caller_history(caller_phone)
+                    return True
+                logger.error(f"[SHUTDOWN] save_call_log failed: {result.get('message')}")
+            except Exception as e:
+                logger.error(f"[SHUTDOWN] save_call_log EXCEPTION: {e}")
+            return False
+
+        _, saved, _ = await asyncio.gather(trigger_n8n(), save_log(), transcript_batcher.close())
+
+        # One structured summary line instead of a banner of separate info logs
+        logger.info("[SHUTDOWN] %s", _json_dumps({
+            "event":          "call_shutdown",
+            "room":           ctx.room.name,
+            "phone":          caller_phone,
+            "duration_s":     duration,
+            "turns":          state.turn_count,
+            "interrupts":     state.interrupt_count,
+            "booking":        booking_status_msg,
+            "sentiment":      sentiment,
+            "cost_usd":       estimated_cost,
+            "egress_id":      egress_id,
+            "recording":      bool(recording_url),
+            "saved":          saved,
+        }).decode())
+
+        if notify_task:
+            try:
+                await notify_task
+            except Exception as e:
+                logger.warning(f"[NOTIFY] Failed: {e}")
+
+        # Last Cal.com user for this job is the booking above — release the pool
+        # once no slot lookup can still be using it
+        await agent_tools.cancel_slot_tasks()
+        await close_http_client()
 
     ctx.add_shutdown_callback(unified_shutdown_hook)
 
@@ -1,120 +1,353 @@
 import os
+import time
+import asyncio
 import logging
-import requests
 import httpx
+from dataclasses import dataclass
 from datetime import datetime
+from zoneinfo import ZoneInfo
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
 
 logger = logging.getLogger("calendar-tools")
 
-CAL_BASE = "https://api.cal.com/v1"
+CAL_HOST = "https://api.cal.com"
+_IST     = ZoneInfo("Asia/Kolkata")
+
+
+# ─── Shared Cal.com HTTP client ────────────────────────────────────────────────
+# One keep-alive HTTP/2 pool per event loop: slot checks and bookings reuse the
+# TLS connection instead of handshaking on every tool call. httpx clients are
+# bound to the loop they were first used on, so a new loop gets a new client.
+_HTTP: httpx.AsyncClient | None = None
+_HTTP_LOOP: asyncio.AbstractEventLoop | None = None
+_HTTP_SEM: asyncio.Semaphore | None = None
+
+
+def _cal_http() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    global _HTTP, _HTTP_LOOP, _HTTP_SEM
+    loop = asyncio.get_running_loop()
+    if _HTTP is None or _HTTP.is_closed or _HTTP_LOOP is not loop:
+        _HTTP = httpx.AsyncClient(
+            base_url=CAL_HOST,
+            http2=True,
+            timeout=8.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+        _HTTP_LOOP = loop
+        _HTTP_SEM  = asyncio.Semaphore(10)  # cap in-flight Cal.com requests per worker
+    return _HTTP, _HTTP_SEM
+
+
+async def close_http_client() -> None:
+    """Close the shared Cal.com client (call from the worker's shutdown path)."""
+    global _HTTP, _HTTP_LOOP, _HTTP_SEM
+    if _HTTP is not None and not _HTTP.is_closed:
+        await _HTTP.aclose()
+    _HTTP = _HTTP_LOOP = _HTTP_SEM = None
+
+
+# ─── Calendar config ───────────────────────────────────────────────────────────
+# Read once instead of on every slot lookup / booking. The agent applies
+# config.json overrides to os.environ per call, then calls reload_cal_config().
+@dataclass(frozen=True, slots=True)
+class _CalConfig:
+    api_key:      str
+    event_id:     int
+    gcal_id:      str
+    gcal_creds:   str
+    gcal_enabled: bool
+
+
+def _load_cal_config() -> _CalConfig:
+    gcal_id    = os.environ.get("GOOGLE_CALENDAR_ID", "")
+    gcal_creds = os.environ.get("GOOGLE_SERVICE_ACCOUNT_FILE", "google_creds.json")
+    return _CalConfig(
+        api_key=os.environ.get("CAL_API_KEY", ""),
+        event_id=int(os.environ.get("CAL_EVENT_TYPE_ID", "0") or "0"),
+        gcal_id=gcal_id,
+        gcal_creds=gcal_creds,
+        gcal_enabled=bool(gcal_id) and os.path.exists(gcal_creds),
+    )
+
+
+_CFG = _load_cal_config()
+
+
+def reload_cal_config() -> None:
+    """Re-read calendar settings from the environment."""
+    global _CFG
+    _CFG = _load_cal_config()
+
+
+def calendar_configured() -> bool:
+    """True when a booking backend (Cal.com key or Google Calendar) is set up."""
+    return bool(_CFG.api_key or _CFG.gcal_enabled)
 
 
 def get_cal_creds() -> dict:
-    return {
-        "api_key":  os.environ.get("CAL_API_KEY", ""),
-        "event_id": int(os.environ.get("CAL_EVENT_TYPE_ID", "0") or "0"),
-    }
+    return {"api_key": _CFG.api_key, "event_id": _CFG.event_id}
 
 
 # ─── Cal.com: Get available slots ─────────────────────────────────────────────
 
-def get_available_slots(date_str: str) -> list:
+# ─── Google Calendar client (#36) ─────────────────────────────────────────────
+# Parsing the service-account key and building the discovery client costs far
+# more than the API call itself — do it once per credentials file.
+_GCAL: tuple[str, object, object] | None = None   # (creds_file, credentials, service)
+_GCAL_LOCK = asyncio.Lock()
+
+
+async def _gcal_service(creds_file: str) -> tuple:
+    global _GCAL
+    async with _GCAL_LOCK:
+        if _GCAL is None or _GCAL[0] != creds_file:
+            def _build():
+                from googleapiclient.discovery import build
+                from google.oauth2 import service_account
+                creds = service_account.Credentials.from_service_account_file(
+                    creds_file,
+                    scopes=["https://www.googleapis.com/auth/calendar"],
+                )
+                return creds, build("calendar", "v3", credentials=creds, cache_discovery=False)
+            creds, service = await asyncio.to_thread(_build)
+            _GCAL = (creds_file, creds, service)
+        return _GCAL[1], _GCAL[2]
+
+
+def _gcal_http(creds):
+    """httplib2 connections aren't thread-safe — each threaded request gets its own."""
+    import httplib2
+    import google_auth_httplib2
+    return google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+
+
+# ─── Slot labels ───────────────────────────────────────────────────────────────
+# Minute-of-day → "4:30 PM" (same text as strftime("%-I:%M %p"), built once)
+_SLOT_LABELS = tuple(
+    f"{(h % 12) or 12}:{m:02d} {'AM' if h < 12 else 'PM'}"
+    for h in range(24) for m in range(60)
+)
+
+
+# ─── Slot cache ────────────────────────────────────────────────────────────────
+# Callers often re-ask about the same day ("any morning slot?", "what about 11?").
+# Serve repeats from memory for a minute; bookings drop the day they touched.
+SLOTS_CACHE_TTL       = 60  # seconds
+SLOTS_EMPTY_CACHE_TTL = 20  # fully-booked days — shorter, a cancellation may free one
+_SLOTS_CACHE: dict[tuple[str, str], tuple[float, list]] = {}
+
+
+def invalidate_slots(date_str: str) -> None:
+    for key in [k for k in _SLOTS_CACHE if k[1] == date_str]:
+        _SLOTS_CACHE.pop(key, None)
+
+
+async def get_available_slots(date_str: str) -> list:
     """
     Fetch open slots for a given date from Cal.com OR Google Calendar,
     depending on which is configured.
     date_str: "YYYY-MM-DD"
     """
-    # Try Google Calendar first if configured (#36)
-    gcal_id = os.environ.get("GOOGLE_CALENDAR_ID", "")
-    gcal_creds = os.environ.get("GOOGLE_SERVICE_ACCOUNT_FILE", "google_creds.json")
-    if gcal_id and os.path.exists(gcal_creds):
-        try:
-            return _get_slots_gcal(date_str, gcal_id, gcal_creds)
-        except Exception as e:
-            logger.warning(f"[GCAL] Falling back to Cal.com: {e}")
+    return (await get_available_slots_batch([date_str]))[date_str]
 
-    # Default: Cal.com
-    return _get_slots_calcom(date_str)
+
+async def get_available_slots_batch(dates: list[str]) -> dict[str, list]:
+    """
+    Fetch open slots for several dates with one request per backend — both
+    Cal.com /slots and Google freebusy accept a multi-day range.
+    Returns {date_str: [slot, ...]} for every requested date.
+    """
+    cfg     = _CFG
+    backend = "gcal" if cfg.gcal_enabled else "calcom"
+
+    out: dict[str, list] = {}
+    missing: list[str] = []
+    now = time.monotonic()
+    for date_str in dict.fromkeys(dates):
+        cached = _SLOTS_CACHE.get((backend, date_str))
+        if cached and now - cached[0] < (SLOTS_CACHE_TTL if cached[1] else SLOTS_EMPTY_CACHE_TTL):
+            logger.info("[CAL] Cache hit: %d slots for %s", len(cached[1]), date_str)
+            out[date_str] = list(cached[1])
+        else:
+            missing.append(date_str)
+
+    if missing:
+        answered_by, fetched = await _fetch_slots(missing, cfg)
+        now = time.monotonic()
+        for date_str in missing:
+            # A failed lookup comes back without the date — don't cache it. Real
+            # answers (empty days too) are cached under the backend that gave
+            # them, so a Cal.com fallback never poses as GCal
+            slots = fetched.get(date_str)
+            if slots is None:
+                out[date_str] = []
+                continue
+            _SLOTS_CACHE[(answered_by, date_str)] = (now, slots)
+            out[date_str] = list(slots)
+    return out
+
+
+# A slow Cal.com edge node shouldn't turn into 5–8s of silence: after this long
+# a duplicate slot request is raced against the first one.
+SLOT_HEDGE_DELAY = 0.5
+
+
+async def _fetch_slots(dates: list[str], cfg: _CalConfig) -> tuple[str, dict[str, list]]:
+    """(backend that answered, {date: slots}); the dict is empty if the lookup failed."""
+    if not cfg.gcal_enabled:
+        return "calcom", await _get_slots_calcom(dates)
+    if not cfg.api_key:
+        return "gcal", await _get_slots_gcal_safe(dates, cfg.gcal_id, cfg.gcal_creds)
+
+    # Both configured (#36): bookings go to Google, so a successful GCal answer
+    # wins even when every day is full. Cal.com is asked in parallel only so a
+    # GCal failure falls back without serialising a second round-trip
+    cal = asyncio.create_task(_get_slots_calcom(dates))
+    try:
+        gcal_slots = await _get_slots_gcal_safe(dates, cfg.gcal_id, cfg.gcal_creds)
+        if gcal_slots:
+            return "gcal", gcal_slots
+        return "calcom", await cal
+    finally:
+        cal.cancel()
 
 
-def _get_slots_calcom(date_str: str) -> list:
-    creds = get_cal_creds()
+async def _get_slots_gcal_safe(dates: list[str], gcal_id: str, gcal_creds: str) -> dict[str, list]:
     try:
-        resp = requests.get(
-            f"{CAL_BASE}/slots",
-            headers={"Content-Type": "application/json"},
-            params={
-                "apiKey":      creds["api_key"],
-                "eventTypeId": creds["event_id"],
-                "startTime":   f"{date_str}T00:00:00.000Z",
-                "endTime":     f"{date_str}T23:59:59.000Z",
-            },
-            timeout=8,
-        )
-        resp.raise_for_status()
-        raw_slots = resp.json().get("data", {}).get("slots", {}).get(date_str, [])
-        slots = []
-        for s in raw_slots:
-            dt = datetime.fromisoformat(s["time"])
-            slots.append({"time": s["time"], "label": dt.strftime("%-I:%M %p")})
-        logger.info(f"[CAL] {len(slots)} slots for {date_str}")
-        return slots
+        return await _get_slots_gcal(dates, gcal_id, gcal_creds)
     except Exception as e:
-        logger.error(f"[CAL] get_available_slots error: {e}")
-        return []
+        logger.warning(f"[GCAL] Slot lookup failed: {e}")
+        return {}
 
 
-def _get_slots_gcal(date_str: str, calendar_id: str, creds_file: str) -> list:
+async def _hedged(fetch, delay: float = SLOT_HEDGE_DELAY):
     """
-    Fetch busy slots from Google Calendar and compute free windows (#36).
-    Requires: google-api-python-client, google-auth
+    Run fetch(); if it hasn't answered within `delay`, fire one more attempt and
+    take whichever succeeds first. Only for idempotent reads — never bookings.
     """
-    from googleapiclient.discovery import build
-    from google.oauth2 import service_account
+    first = asyncio.create_task(fetch())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+    logger.info(f"[CAL] No answer after {delay}s — sending hedged request")
+    pending = {first, asyncio.create_task(fetch())}
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Both can land in the same wait — a success among them always wins.
+            # Check every task so a failed sibling's exception is still retrieved
+            ok = [task for task in done if task.exception() is None]
+            if ok:
+                return ok[0].result()
+            if not pending:
+                raise next(iter(done)).exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _get_slots_calcom(dates: list[str]) -> dict[str, list]:
+    creds = get_cal_creds()
 
-    creds = service_account.Credentials.from_service_account_file(
-        creds_file,
-        scopes=["https://www.googleapis.com/auth/calendar.readonly"],
-    )
-    service = build("calendar", "v3", credentials=creds)
+    async def _get() -> httpx.Response:
+        client, sem = _cal_http()
+        async with sem:
+            resp = await client.get(
+                "/v1/slots",
+                headers={"Content-Type": "application/json"},
+                params={
+                    "apiKey":      creds["api_key"],
+                    "eventTypeId": creds["event_id"],
+                    "startTime":   f"{min(dates)}T00:00:00.000Z",
+                    "endTime":     f"{max(dates)}T23:59:59.000Z",
+                },
+            )
+        resp.raise_for_status()
+        return resp
 
-    start = f"{date_str}T00:00:00+05:30"
-    end   = f"{date_str}T23:59:59+05:30"
+    try:
+        resp = await _hedged(_get)
+        by_date = _json_loads(resp.content).get("data", {}).get("slots", {})
+        out = {}
+        for date_str in dates:
+            # Cal returns fixed-offset ISO strings — read HH:MM straight out of the
+            # string instead of a full fromisoformat() + strftime() per slot
+            out[date_str] = [
+                {"time": t, "label": _SLOT_LABELS[int(t[11:13]) * 60 + int(t[14:16])]}
+                for t in (s["time"] for s in by_date.get(date_str, []))
+            ]
+            logger.info("[CAL] %d slots for %s", len(out[date_str]), date_str)
+        return out
+    except Exception as e:
+        logger.error(f"[CAL] get_available_slots error: {e}")
+        return {}
 
-    result = service.freebusy().query(body={
-        "timeMin": start,
-        "timeMax": end,
-        "items":   [{"id": calendar_id}],
-    }).execute()
 
+async def _get_slots_gcal(dates: list[str], calendar_id: str, creds_file: str) -> dict[str, list]:
+    """
+    Fetch busy slots from Google Calendar and compute free windows (#36).
+    Requires: google-api-python-client, google-auth
+    """
+    creds, service = await _gcal_service(creds_file)
+    start = f"{min(dates)}T00:00:00+05:30"
+    end   = f"{max(dates)}T23:59:59+05:30"
+
+    # googleapiclient is blocking (httplib2) — run the round-trip in a thread
+    def _freebusy() -> dict:
+        return service.freebusy().query(body={
+            "timeMin": start,
+            "timeMax": end,
+            "items":   [{"id": calendar_id}],
+        }).execute(http=_gcal_http(creds))
+
+    result = await asyncio.to_thread(_freebusy)
     busy_slots = result.get("calendars", {}).get(calendar_id, {}).get("busy", [])
 
-    # Generate free 30-min slots between 10:00 and 19:00 IST
-    import pytz
-    from datetime import timedelta
-    ist = pytz.timezone("Asia/Kolkata")
-    day_start = ist.localize(datetime.strptime(f"{date_str} 10:00", "%Y-%m-%d %H:%M"))
-    day_end   = ist.localize(datetime.strptime(f"{date_str} 19:00", "%Y-%m-%d %H:%M"))
-
-    busy_ranges = []
-    for b in busy_slots:
-        bs = datetime.fromisoformat(b["start"]).astimezone(ist)
-        be = datetime.fromisoformat(b["end"]).astimezone(ist)
-        busy_ranges.append((bs, be))
+    # Merge busy intervals (epoch seconds) so their ends are monotonic; each day
+    # then sweeps its slot grid once instead of testing every slot against every interval
+    busy: list[list[int]] = []
+    for bs, be in sorted(
+        (int(datetime.fromisoformat(b["start"]).timestamp()), int(datetime.fromisoformat(b["end"]).timestamp()))
+        for b in busy_slots
+    ):
+        if busy and bs <= busy[-1][1]:
+            busy[-1][1] = max(busy[-1][1], be)
+        else:
+            busy.append([bs, be])
+
+    out = {}
+    for date_str in dates:
+        out[date_str] = _free_slots_for_day(date_str, busy)
+        logger.info("[GCAL] %d free slots for %s", len(out[date_str]), date_str)
+    return out
+
+
+def _free_slots_for_day(date_str: str, busy: list[list[int]]) -> list:
+    """Free 30-min slots between 10:00 and 19:00 IST, given merged busy intervals."""
+    day_start = int(datetime.strptime(f"{date_str} 10:00", "%Y-%m-%d %H:%M").replace(tzinfo=_IST).timestamp())
+    day_end   = int(datetime.strptime(f"{date_str} 19:00", "%Y-%m-%d %H:%M").replace(tzinfo=_IST).timestamp())
 
     free_slots = []
-    slot = day_start
-    while slot < day_end:
-        slot_end = slot + timedelta(minutes=30)
-        is_busy = any(bs <= slot < be for bs, be in busy_ranges)
-        if not is_busy:
-            free_slots.append({
-                "time":  slot.isoformat(),
-                "label": slot.strftime("%-I:%M %p"),
-            })
-        slot = slot_end
-
-    logger.info(f"[GCAL] {len(free_slots)} free slots for {date_str}")
+    i = 0
+    for ts in range(day_start, day_end, 1800):
+        while i < len(busy) and busy[i][1] <= ts:
+            i += 1
+        if i < len(busy) and busy[i][0] <= ts:
+            continue
+        slot = datetime.fromtimestamp(ts, _IST)
+        free_slots.append({
+            "time":  slot.isoformat(),
+            "label": _SLOT_LABELS[slot.hour * 60 + slot.minute],
+        })
     return free_slots
 
 
@@ -126,14 +359,16 @@ def create_booking(
     caller_phone: str,
     notes: str = "",
 ) -> dict:
-    """Synchronous wrapper — calls async_create_booking."""
-    import asyncio
+    """
+    Synchronous wrapper for scripts — calls async_create_booking.
+    Async code (the agent) must await async_create_booking directly.
+    """
     try:
-        return asyncio.get_event_loop().run_until_complete(
-            async_create_booking(start_time, caller_name, caller_phone, notes)
-        )
+        asyncio.get_running_loop()
     except RuntimeError:
         return asyncio.run(async_create_booking(start_time, caller_name, caller_phone, notes))
+    # Blocking on a future from the loop's own thread would deadlock it
+    raise RuntimeError("create_booking() called from a running event loop — await async_create_booking() instead")
 
 
 async def async_create_booking(
@@ -148,13 +383,20 @@ async def async_create_booking(
     start_time: ISO 8601 with IST offset e.g. "2026-02-24T10:00:00+05:30"
     Returns: {"success": bool, "booking_id": str|None, "message": str}
     """
-    gcal_id    = os.environ.get("GOOGLE_CALENDAR_ID", "")
-    gcal_creds = os.environ.get("GOOGLE_SERVICE_ACCOUNT_FILE", "google_creds.json")
+    cfg = _CFG
+    if cfg.gcal_enabled:
+        result = await _create_booking_gcal(start_time, caller_name, caller_phone, notes, cfg.gcal_id, cfg.gcal_creds)
+    else:
+        result = await _create_booking_calcom(start_time, caller_name, caller_phone, notes, caller_email)
 
-    if gcal_id and os.path.exists(gcal_creds):
-        return await _create_booking_gcal(start_time, caller_name, caller_phone, notes, gcal_id, gcal_creds)
+    if result.get("success"):
+        invalidate_slots(start_time[:10])
+    return result
 
-    return await _create_booking_calcom(start_time, caller_name, caller_phone, notes, caller_email)
+
+# Invariant parts of the Cal.com v2 booking body; only caller fields vary.
+_BOOKING_ATTENDEE = {"timeZone": "Asia/Kolkata", "language": "en"}
+_BOOKING_HEADERS  = {"cal-api-version": "2024-08-13", "Content-Type": "application/json"}
 
 
 async def _create_booking_calcom(
@@ -173,11 +415,10 @@ async def _create_booking_calcom(
         "eventTypeId": creds["event_id"],
         "start": start_time,
         "attendee": {
+            **_BOOKING_ATTENDEE,
             "name":        caller_name,
             "email":       attendee_email,
             "phoneNumber": caller_phone,
-            "timeZone":    "Asia/Kolkata",
-            "language":    "en",
         },
         "bookingFieldsResponses": {
             "name":  caller_name,
@@ -188,20 +429,17 @@ async def _create_booking_calcom(
     }
     logger.info(f"[CAL] Booking payload: email={attendee_email}, name={caller_name}, phone={caller_phone}")
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
+        client, sem = _cal_http()
+        async with sem:
             resp = await client.post(
-                "https://api.cal.com/v2/bookings",
-                headers={
-                    "Authorization":  f"Bearer {creds['api_key']}",
-                    "cal-api-version": "2024-08-13",
-                    "Content-Type":   "application/json",
-                },
-                json=payload,
+                "/v2/bookings",
+                headers={**_BOOKING_HEADERS, "Authorization": f"Bearer {creds['api_key']}"},
+                content=_json_dumps(payload),
             )
             if resp.status_code not in (200, 201):
                 logger.error(f"[CAL] Booking failed {resp.status_code}: {resp.text}")
                 return {"success": False, "booking_id": None, "message": resp.text}
-            uid = resp.json().get("data", {}).get("uid", "unknown")
+            uid = _json_loads(resp.content).get("data", {}).get("uid", "unknown")
             logger.info(f"[CAL] Booking created: uid={uid}")
             return {"success": True, "booking_id": uid, "message": "Booking confirmed"}
     except httpx.TimeoutException:
@@ -221,15 +459,9 @@ async def _create_booking_gcal(
 ) -> dict:
     """Create a Google Calendar event (#36)."""
     try:
-        from googleapiclient.discovery import build
-        from google.oauth2 import service_account
         from datetime import timedelta
 
-        creds = service_account.Credentials.from_service_account_file(
-            creds_file,
-            scopes=["https://www.googleapis.com/auth/calendar"],
-        )
-        service = build("calendar", "v3", credentials=creds)
+        creds, service = await _gcal_service(creds_file)
 
         dt_start = datetime.fromisoformat(start_time)
         dt_end   = dt_start + timedelta(minutes=30)
@@ -242,7 +474,10 @@ async def _create_booking_gcal(
             "attendees":   [{"displayName": caller_name, "comment": caller_phone}],
         }
 
-        created = service.events().insert(calendarId=calendar_id, body=event).execute()
+        # googleapiclient is blocking — keep the insert off the event loop
+        created = await asyncio.to_thread(
+            lambda: service.events().insert(calendarId=calendar_id, body=event).execute(http=_gcal_http(creds))
+        )
         event_id = created.get("id", "unknown")
         logger.info(f"[GCAL] Event created: id={event_id}")
         return {"success": True, "booking_id": event_id, "message": "Google Calendar event created"}
@@ -253,19 +488,41 @@ async def _create_booking_gcal(
 
 # ─── Cancel a booking ──────────────────────────────────────────────────────────
 
-def cancel_booking(booking_id: str, reason: str = "Cancelled by caller") -> dict:
-    """Cancel a Cal.com booking by UID."""
+async def cancel_booking(booking_id: str, reason: str = "Cancelled by caller") -> dict:
+    """
+    Cancel a booking made by async_create_booking. Takes the returned booking_id:
+    a GCal event ID, or a Cal.com booking UID (cancelled via v2, same auth as create).
+    """
+    cfg = _CFG
+    if cfg.gcal_enabled:
+        return await _cancel_booking_gcal(booking_id, cfg.gcal_id, cfg.gcal_creds)
     creds = get_cal_creds()
     try:
-        resp = requests.delete(
-            f"{CAL_BASE}/bookings/{booking_id}/cancel?apiKey={creds['api_key']}",
-            headers={"Content-Type": "application/json"},
-            json={"reason": reason},
-            timeout=8,
-        )
-        resp.raise_for_status()
-        logger.info(f"[CAL] Booking cancelled: {booking_id}")
+        client, sem = _cal_http()
+        async with sem:
+            resp = await client.post(
+                f"/v2/bookings/{booking_id}/cancel",
+                headers={**_BOOKING_HEADERS, "Authorization": f"Bearer {creds['api_key']}"},
+                content=_json_dumps({"cancellationReason": reason}),
+            )
+        if resp.status_code not in (200, 201):
+            logger.error(f"[CAL] Cancel failed {resp.status_code}: {resp.text}")
+            return {"success": False, "message": resp.text}
+        logger.info(f"[CAL] Booking cancelled: uid={booking_id}")
         return {"success": True, "message": "Cancelled successfully"}
     except Exception as e:
         logger.error(f"[CAL] cancel_booking error: {e}")
         return {"success": False, "message": str(e)}
+
+
+async def _cancel_booking_gcal(event_id: str, calendar_id: str, creds_file: str) -> dict:
+    try:
+        creds, service = await _gcal_service(creds_file)
+        await asyncio.to_thread(
+            lambda: service.events().delete(calendarId=calendar_id, eventId=event_id).execute(http=_gcal_http(creds))
+        )
+        logger.info(f"[GCAL] Event deleted: id={event_id}")
+        return {"success": True, "message": "Cancelled successfully"}
+    except Exception as e:
+        logger.error(f"[GCAL] Cancel booking failed: {e}")
+        return {"success": False, "message": str(e)}
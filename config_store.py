@@ -0,0 +1,45 @@
+import os
+import json
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+CONFIG_FILE = "config.json"
+
+
+# ─── Cached JSON config reads ──────────────────────────────────────────────────
+# Shared by the agent worker and the dashboard so both read config files the
+# same way. Parsed files are keyed by path → (st_mtime_ns, st_size, data) and
+# only re-parsed when the file changes. Cached dicts are shared — read-only.
+_json_cache: dict[str, tuple[int, int, dict]] = {}
+
+
+def load_json_file(path: str) -> dict:
+    """Parsed contents of `path`; raises FileNotFoundError if it doesn't exist."""
+    st = os.stat(path)
+    cached = _json_cache.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    with open(path, "rb") as f:
+        data = _json_loads(f.read())
+    _json_cache[path] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+
+# ─── Atomic writes ─────────────────────────────────────────────────────────────
+
+def write_json_file(path: str, data: dict) -> None:
+    """
+    Serialize first, then swap the file in with os.replace — readers never see
+    a half-written file. The cache is primed with what was just written.
+    """
+    body = json.dumps(data, indent=4).encode()
+    tmp  = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+    st = os.stat(path)
+    _json_cache[path] = (st.st_mtime_ns, st.st_size, data)
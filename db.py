@@ -1,21 +1,29 @@
 import os
+import asyncio
 import logging
+from functools import lru_cache
 from supabase import create_client, Client
 
 logger = logging.getLogger("db")
 
+@lru_cache(maxsize=4)
+def _client_for(url: str, key: str) -> Client:
+    # One client (and its keep-alive HTTP pool) per credentials pair — every
+    # transcript flush, call log and active_calls upsert reuses the connection
+    return create_client(url, key)
+
 def get_supabase() -> Client | None:
     url = os.environ.get("SUPABASE_URL", "")
     key = os.environ.get("SUPABASE_KEY", "")
     if not url or not key:
         return None
     try:
-        return create_client(url, key)
+        return _client_for(url, key)
     except Exception as e:
         logger.error(f"Failed to initialize Supabase client: {e}")
         return None
 
-def save_call_log(
+def build_call_log_row(
     phone: str,
     duration: int,
     transcript: str,
@@ -30,6 +38,26 @@ def save_call_log(
     was_booked: bool = False,
     interrupt_count: int = 0,
 ) -> dict:
+    """Builds a 'call_logs' row, omitting optional columns that have no value."""
+    data: dict = {
+        "phone_number":      phone,
+        "duration_seconds":  duration,
+        "transcript":        transcript,
+        "summary":           summary,
+        "sentiment":         sentiment,
+        "was_booked":        was_booked,
+        "interrupt_count":   interrupt_count,
+    }
+    if recording_url:           data["recording_url"]         = recording_url
+    if caller_name:             data["caller_name"]            = caller_name
+    if estimated_cost_usd is not None: data["estimated_cost_usd"] = estimated_cost_usd
+    if call_date:               data["call_date"]              = call_date
+    if call_hour is not None:   data["call_hour"]              = call_hour
+    if call_day_of_week:        data["call_day_of_week"]       = call_day_of_week
+    return data
+
+
+def save_call_log(phone: str, duration: int, transcript: str, **fields) -> dict:
     """Saves a call log to the 'call_logs' table in Supabase."""
     url = os.environ.get("SUPABASE_URL", "")
     key = os.environ.get("SUPABASE_KEY", "")
@@ -42,22 +70,7 @@ def save_call_log(
         return {"success": False, "message": "Supabase client failed"}
 
     try:
-        data: dict = {
-            "phone_number":      phone,
-            "duration_seconds":  duration,
-            "transcript":        transcript,
-            "summary":           summary,
-            "sentiment":         sentiment,
-            "was_booked":        was_booked,
-            "interrupt_count":   interrupt_count,
-        }
-        if recording_url:           data["recording_url"]         = recording_url
-        if caller_name:             data["caller_name"]            = caller_name
-        if estimated_cost_usd is not None: data["estimated_cost_usd"] = estimated_cost_usd
-        if call_date:               data["call_date"]              = call_date
-        if call_hour is not None:   data["call_hour"]              = call_hour
-        if call_day_of_week:        data["call_day_of_week"]       = call_day_of_week
-
+        data = build_call_log_row(phone, duration, transcript, **fields)
         res = supabase.table("call_logs").insert(data).execute()
         logger.info(f"Saved call log to Supabase for {phone}")
         return {"success": True, "data": res.data}
@@ -66,6 +79,60 @@ def save_call_log(
         return {"success": False, "message": str(e)}
 
 
+def finalize_call(room_id: str, phone: str, duration: int, transcript: str,
+                  transcripts: list | None = None, **fields) -> dict:
+    """
+    Finalizes a call in one round-trip via the finalize_call() Postgres function:
+    marks the active_calls row completed, inserts the call_logs row and any
+    pending call_transcripts rows in a single transaction.
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"success": False, "message": "Supabase not configured"}
+    try:
+        res = supabase.rpc("finalize_call", {
+            "room":        room_id,
+            "phone":       phone,
+            "payload":     build_call_log_row(phone, duration, transcript, **fields),
+            "transcripts": transcripts or [],
+        }).execute()
+        logger.info(f"Finalized call {room_id} for {phone}")
+        return {"success": True, "data": res.data}
+    except Exception as e:
+        logger.error(f"Failed to finalize call {room_id}: {e}")
+        return {"success": False, "message": str(e)}
+
+
+def save_transcript_entries(rows: list) -> dict:
+    """Inserts a batch of real-time transcript rows into 'call_transcripts' in one request."""
+    if not rows:
+        return {"success": True, "data": []}
+    supabase = get_supabase()
+    if not supabase:
+        return {"success": False, "message": "Supabase not configured"}
+    try:
+        res = supabase.table("call_transcripts").insert(rows).execute()
+        return {"success": True, "data": res.data}
+    except Exception as e:
+        logger.error(f"Failed to save transcript batch: {e}")
+        return {"success": False, "message": str(e)}
+
+
+async def save_transcript_entries_async(rows: list) -> dict:
+    """Runs save_transcript_entries in a worker thread so the caller's event loop is not blocked."""
+    return await asyncio.to_thread(save_transcript_entries, rows)
+
+
+async def save_call_log_async(**kwargs) -> dict:
+    """Runs save_call_log in a worker thread so the caller's event loop is not blocked."""
+    return await asyncio.to_thread(save_call_log, **kwargs)
+
+
+async def finalize_call_async(**kwargs) -> dict:
+    """Runs finalize_call in a worker thread so the caller's event loop is not blocked."""
+    return await asyncio.to_thread(finalize_call, **kwargs)
+
+
 def fetch_call_logs(limit: int = 50) -> list:
     """
     Fetches the latest call logs from Supabase for the UI dashboard.
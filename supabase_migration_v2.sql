@@ -44,6 +44,46 @@ ALTER TABLE active_calls ENABLE ROW LEVEL SECURITY;
 CREATE POLICY IF NOT EXISTS "Allow anon upsert active_calls" ON active_calls
     FOR ALL TO anon USING (true) WITH CHECK (true);
 
+-- 4. Single round-trip call finalisation — called once from the agent shutdown hook
+ALTER TABLE call_logs ADD COLUMN IF NOT EXISTS recording_url   TEXT    DEFAULT NULL;
+ALTER TABLE call_logs ADD COLUMN IF NOT EXISTS caller_name     TEXT    DEFAULT NULL;
+
+CREATE OR REPLACE FUNCTION finalize_call(
+    room        TEXT,
+    phone       TEXT,
+    payload     JSONB,
+    transcripts JSONB DEFAULT '[]'::jsonb
+) RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_id BIGINT;
+BEGIN
+    INSERT INTO active_calls (room_id, phone, caller_name, status, last_updated)
+    VALUES (room, phone, payload->>'caller_name', 'completed', NOW())
+    ON CONFLICT (room_id) DO UPDATE
+        SET status = 'completed', last_updated = NOW();
+
+    INSERT INTO call_logs (
+        phone_number, duration_seconds, transcript, summary, recording_url, caller_name,
+        sentiment, estimated_cost_usd, call_date, call_hour, call_day_of_week,
+        was_booked, interrupt_count
+    )
+    SELECT
+        r.phone_number, r.duration_seconds, r.transcript, r.summary, r.recording_url, r.caller_name,
+        r.sentiment, r.estimated_cost_usd, r.call_date, r.call_hour, r.call_day_of_week,
+        COALESCE(r.was_booked, FALSE), COALESCE(r.interrupt_count, 0)
+    FROM jsonb_populate_record(NULL::call_logs, payload) AS r
+    RETURNING id INTO new_id;
+
+    INSERT INTO call_transcripts (call_room_id, phone, role, content)
+    SELECT room, phone, t->>'role', t->>'content'
+    FROM jsonb_array_elements(transcripts) AS t;
+
+    RETURN new_id;
+END;
+$$;
+
 -- ══════════════════════════════════════════════════════════════════════════════
 -- DONE. All new columns and tables are safe to run multiple times (IF NOT EXISTS).
 -- ══════════════════════════════════════════════════════════════════════════════
@@ -1,10 +1,11 @@
-import json
 import logging
 import os
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, PlainTextResponse
 from dotenv import load_dotenv
 
+from config_store import CONFIG_FILE, load_json_file, write_json_file
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -12,37 +13,40 @@ logger = logging.getLogger("ui-server")
 
 app = FastAPI(title="RapidX AI Dashboard")
 
-CONFIG_FILE = "config.json"
+# (config.json key, env var fallback, default) for every dashboard-managed setting
+_CONFIG_FIELDS = (
+    ("first_line",                "FIRST_LINE",                "Namaste! This is Aryan from RapidX AI — we help businesses automate with AI. Hmm, may I ask what kind of business you run?"),
+    ("agent_instructions",        "AGENT_INSTRUCTIONS",        ""),
+    ("stt_min_endpointing_delay", "STT_MIN_ENDPOINTING_DELAY", 0.6),
+    ("llm_model",                 "LLM_MODEL",                 "gpt-4o-mini"),
+    ("tts_voice",                 "TTS_VOICE",                 "kavya"),
+    ("tts_language",              "TTS_LANGUAGE",              "hi-IN"),
+    ("livekit_url",               "LIVEKIT_URL",               ""),
+    ("sip_trunk_id",              "SIP_TRUNK_ID",              ""),
+    ("livekit_api_key",           "LIVEKIT_API_KEY",           ""),
+    ("livekit_api_secret",        "LIVEKIT_API_SECRET",        ""),
+    ("openai_api_key",            "OPENAI_API_KEY",            ""),
+    ("sarvam_api_key",            "SARVAM_API_KEY",            ""),
+    ("cal_api_key",               "CAL_API_KEY",               ""),
+    ("cal_event_type_id",         "CAL_EVENT_TYPE_ID",         ""),
+    ("telegram_bot_token",        "TELEGRAM_BOT_TOKEN",        ""),
+    ("telegram_chat_id",          "TELEGRAM_CHAT_ID",          ""),
+    ("supabase_url",              "SUPABASE_URL",              ""),
+    ("supabase_key",              "SUPABASE_KEY",              ""),
+)
 
 def read_config():
-    config = {}
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-
-    def get_val(key, env_key, default=""):
-        return config.get(key) if config.get(key) else os.getenv(env_key, default)
-
-    resolved = {
-        "first_line": get_val("first_line", "FIRST_LINE", "Namaste! This is Aryan from RapidX AI — we help businesses automate with AI. Hmm, may I ask what kind of business you run?"),
-        "agent_instructions": get_val("agent_instructions", "AGENT_INSTRUCTIONS", ""),
-        "stt_min_endpointing_delay": float(get_val("stt_min_endpointing_delay", "STT_MIN_ENDPOINTING_DELAY", 0.6)),
-        "llm_model": get_val("llm_model", "LLM_MODEL", "gpt-4o-mini"),
-        "tts_voice": get_val("tts_voice", "TTS_VOICE", "kavya"),
-        "tts_language": get_val("tts_language", "TTS_LANGUAGE", "hi-IN"),
-        "livekit_url": get_val("livekit_url", "LIVEKIT_URL", ""),
-        "sip_trunk_id": get_val("sip_trunk_id", "SIP_TRUNK_ID", ""),
-        "livekit_api_key": get_val("livekit_api_key", "LIVEKIT_API_KEY", ""),
-        "livekit_api_secret": get_val("livekit_api_secret", "LIVEKIT_API_SECRET", ""),
-        "openai_api_key": get_val("openai_api_key", "OPENAI_API_KEY", ""),
-        "sarvam_api_key": get_val("sarvam_api_key", "SARVAM_API_KEY", ""),
-        "cal_api_key": get_val("cal_api_key", "CAL_API_KEY", ""),
-        "cal_event_type_id": get_val("cal_event_type_id", "CAL_EVENT_TYPE_ID", ""),
-        "telegram_bot_token": get_val("telegram_bot_token", "TELEGRAM_BOT_TOKEN", ""),
-        "telegram_chat_id": get_val("telegram_chat_id", "TELEGRAM_CHAT_ID", ""),
-        "supabase_url": get_val("supabase_url", "SUPABASE_URL", ""),
-        "supabase_key": get_val("supabase_key", "SUPABASE_KEY", ""),
-    }
+    try:
+        config = load_json_file(CONFIG_FILE)
+    except FileNotFoundError:
+        config = {}
+
+    # config.json wins unless the value is missing or "" — 0 / 0.0 / False are kept
+    resolved = {}
+    for key, env_key, default in _CONFIG_FIELDS:
+        val = config.get(key)
+        resolved[key] = val if val not in (None, "") else os.getenv(env_key, default)
+    resolved["stt_min_endpointing_delay"] = float(resolved["stt_min_endpointing_delay"])
     # Merge extra config.json keys (e.g. lang_preset) without overwriting resolved values
     for k, v in config.items():
         if k not in resolved:
@@ -52,8 +56,7 @@ def read_config():
 def write_config(data):
     config = read_config()
     config.update(data)
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    write_json_file(CONFIG_FILE, config)
 
 # ── API Endpoints ──────────────────────────────────────────────────────────────
 
@@ -86,7 +89,6 @@ async def api_get_transcript(log_id: str):
     config = read_config()
     os.environ["SUPABASE_URL"] = config.get("supabase_url", "")
     os.environ["SUPABASE_KEY"] = config.get("supabase_key", "")
-    import db
     try:
         from supabase import create_client
         supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
@@ -327,7 +329,7 @@ async def api_demo_token():
     config = read_config()
     try:
         from livekit.api import AccessToken, VideoGrants
-        import time, random
+        import random
         room_name = f"demo-{random.randint(10000,99999)}"
         api_key    = config.get("livekit_api_key") or os.environ.get("LIVEKIT_API_KEY","")
         api_secret = config.get("livekit_api_secret") or os.environ.get("LIVEKIT_API_SECRET","")